@@ -1,10 +1,16 @@
 import os
 
-from flask import Flask, request, jsonify, send_file
-from utils import get_news_summary_sentiment
-from text_to_speech import generate_audio
-from summarizer import all_articles_summary_with_gemini, all_articles_comparative_analysis_with_gemini
+from flask import Flask, request, jsonify, send_file, Response, stream_with_context
+from utils import get_news_summary_sentiment, iter_news_summary_sentiment, periodic_clean
+from text_to_speech import generate_audio, iter_audio_chunks
+from summarizer import summarizer_is_warm, warmup_summarizer
+from insights import get_insights
+from config import get_env_bool
+from jobs import job_manager, QueueFullError
 import io
+import json
+import threading
+import time
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -12,41 +18,57 @@ load_dotenv()
 app = Flask(__name__)
 
 
+def parse_news_params(params):
+    """ Validate the news query (query string or JSON body). Returns (True, (company, limit, skip, gemini)) or (False, error) """
+    company = params.get('company')
+    if company is None:
+        return False, "Company name is required"
+
+    if len(company) < 3:
+        return False, "Company name must be at least 3 characters long."
+
+    limit = params.get('limit', 5)
+    try:
+        limit = int(limit)
+        if limit > 12:
+            limit = 12
+    except Exception:
+        limit = 5
+
+    skip = params.get('skip', 0)
+    try:
+        skip = int(skip)
+    except Exception:
+        skip = 0
+
+    use_gemini_ai = params.get("gemini", False)
+    if isinstance(use_gemini_ai, str):
+        use_gemini_ai = use_gemini_ai.lower()
+        use_gemini_ai = use_gemini_ai == 'true'
+    else:
+        use_gemini_ai = use_gemini_ai is True
+
+    if not use_gemini_ai and limit > 10:
+        limit = 10
+
+    return True, (company, limit, skip, use_gemini_ai)
+
+
 @app.route('/api/news/summarize', methods=['GET'])
 def get_news():
     try:
-        company = request.args.get('company')
-        if company is None:
-            return jsonify({"error": "Company name is required"}), 400
-
-        if len(company) < 3:
-            return jsonify({"error": "Company name must be at least 3 characters long."}), 400
-
-        limit = request.args.get('limit', 5)
-        if isinstance(limit, str):
-            try:
-                limit = int(limit)
-                if limit > 12:
-                    limit = 12
-            except Exception:
-                limit = 5
-
-        skip = request.args.get('skip', 0)
-        if isinstance(skip, str):
-            try:
-                skip = int(skip)
-            except Exception:
-                skip = 0
-
-        use_gemini_ai = request.args.get("gemini", False)
-        if isinstance(use_gemini_ai, str):
-            use_gemini_ai = use_gemini_ai.lower()
-            use_gemini_ai = use_gemini_ai == 'true'
-        else:
-            use_gemini_ai = False
-
-        if not use_gemini_ai and limit > 10:
-            limit = 10
+        params_status, params = parse_news_params(request.args)
+        if not params_status:
+            return jsonify({"error": params}), 400
+
+        company, limit, skip, use_gemini_ai = params
+
+        # ?stream=true sends NDJSON lines, ?stream=sse server-sent events, one per article as soon as it is ready
+        stream = request.args.get("stream", "false").lower()
+        if stream in ("true", "sse"):
+            return Response(stream_with_context(stream_news(company, limit, skip, use_gemini_ai, sse=stream == "sse")),
+                            mimetype="text/event-stream" if stream == "sse" else "application/x-ndjson",
+                            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
         articles, sentiment_summary = get_news_summary_sentiment(company, limit, skip, use_gemini_ai)
 
@@ -65,6 +87,34 @@ def get_news():
         return jsonify({"error": f"Failed to get related dues articles due to {e}"}), 500
 
 
+def stream_news(company, limit, skip, use_gemini_ai, sse=False):
+    """
+    Yield one event per article as soon as it is summarized, then a final event with the sentiment distribution.
+    Articles arrive in completion order; their Index (search result position) restores the /api/news/summarize order.
+    """
+    def event(name, payload):
+        if sse:
+            return f"event: {name}\ndata: {json.dumps(payload)}\n\n"
+        return json.dumps({"Event": name, **payload}) + "\n"
+
+    sentiment_summary = {"Positive": 0, "Negative": 0, "Neutral": 0}
+    articles_count = 0
+
+    try:
+        for index, article in iter_news_summary_sentiment(company, limit, skip, use_gemini_ai):
+            articles_count += 1
+            sentiment_summary[article["Sentiment"]] += 1
+            yield event("article", {"Index": index, "Article": article})
+
+        if articles_count == 0:
+            yield event("error", {"error": "Sorry, no article found at the movement."})
+            return
+
+        yield event("summary", {"Company": company, "Sentiment Distribution": sentiment_summary})
+    except Exception as e:
+        yield event("error", {"error": f"Failed to get related dues articles due to {e}"})
+
+
 @app.route('/api/text/audio', methods=['POST'])
 def text_to_audio():
     try:
@@ -75,31 +125,59 @@ def text_to_audio():
         if not text or len(text) <= 0:
             return jsonify({"error": "Text is required"}), 400
 
+        # "stream": true sends the MP3 in chunks as soon as the first sentences are synthesized
+        if data.get("stream") is True or request.args.get("stream", "false").lower() == "true":
+            chunks = iter_audio_chunks(text, lang=lang)
+            # Wait for the first chunk before answering, so a text that cannot be synthesized at all gets the
+            # error response below instead of an empty 200 audio/mpeg
+            first_chunk = next(chunks)
+
+            def stream_audio():
+                yield first_chunk
+                yield from chunks
+
+            return Response(stream_with_context(stream_audio()), mimetype="audio/mpeg",
+                            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
         audio_file = generate_audio(text, lang=lang)
         return send_file(audio_file, mimetype="audio/mpeg", as_attachment=True), 200
     except Exception as e:
         return jsonify({"error": f"Failed to convert text to speech due to {e}"}), 500
 
 
-@app.route('/api/news/overview', methods=['POST'])
-def get_overall_summary__insights():
-    try:
-        data = request.get_json()
-        articles = data["articles"]
+def validate_articles(data):
+    """ Returns (True, articles) or (False, error) for a {"articles": [{"title", "summary"}, ...]} body """
+    articles = data.get("articles") if isinstance(data, dict) else None
+
+    if (not isinstance(articles, list)) or len(articles) == 0:
+        return False, "Please provide list of articles"
+
+    for index, article in enumerate(articles):
+        if not isinstance(article, dict) or "title" not in article or "summary" not in article:
+            return False, f"Article at index {index} is missing 'title' or 'summary'."
+
+    return True, articles
 
-        if (not isinstance(articles, list)) or len(articles) == 0:
-            return jsonify({"error": "Please provide list of articles"}), 400
 
-        for index, article in enumerate(articles):
-            if not isinstance(article, dict) or "title" not in article or "summary" not in article:
-                return jsonify({
-                    "error": f"Article at index {index} is missing 'title' or 'summary'."
-                }), 400
+def build_overview(articles):
+    """ (status, markdown or error); identical article lists are answered from the insights cache """
+    status, insights = get_insights(articles, "overview")
+    return status, insights["Markdown"] if status else insights
 
-        joined_summary = "\n".join(
-            f"{article['title']} - {article['summary']}" for article in articles)
 
-        all_summary_response_status, all_summary_response_data = all_articles_summary_with_gemini(joined_summary)
+def build_analysis(articles):
+    status, insights = get_insights(articles, "analysis")
+    return status, insights["Markdown"] if status else insights
+
+
+@app.route('/api/news/overview', methods=['POST'])
+def get_overall_summary__insights():
+    try:
+        articles_status, articles = validate_articles(request.get_json())
+        if not articles_status:
+            return jsonify({"error": articles}), 400
+
+        all_summary_response_status, all_summary_response_data = build_overview(articles)
 
         if not all_summary_response_status:
             return jsonify({"error": all_summary_response_data}), 400
@@ -113,24 +191,11 @@ def get_overall_summary__insights():
 @app.route("/api/news/analysis", methods=['POST'])
 def get_comparative_analysis():
     try:
-        data = request.get_json()
-        articles = data["articles"]
-
-        if (not isinstance(articles, list)) or len(articles) == 0:
-            return jsonify({"error": "Please provide list of articles"}), 400
-
-        for index, article in enumerate(articles):
-            if not isinstance(article, dict) or "title" not in article or "summary" not in article:
-                return jsonify({
-                    "error": f"Article at index {index} is missing 'title' or 'summary'."
-                }), 400
-
-        joined_summary = "\n".join(
-            f"Article-{i + 1}: **{article['title']}** - {article['summary']}"
-            for i, article in enumerate(articles)
-        )
+        articles_status, articles = validate_articles(request.get_json())
+        if not articles_status:
+            return jsonify({"error": articles}), 400
 
-        status, analysis = all_articles_comparative_analysis_with_gemini(joined_summary)
+        status, analysis = build_analysis(articles)
 
         if not status:
             return jsonify({"error": analysis}), 400
@@ -142,6 +207,111 @@ def get_comparative_analysis():
         return jsonify({"error": f"Failed to provide comparative analysis due to {e}"}), 500
 
 
+def run_news_job(job, company, limit, skip, use_gemini_ai):
+    job.update(stage="searching", articles_total=limit)
+
+    articles = []
+    sentiment_summary = {"Positive": 0, "Negative": 0, "Neutral": 0}
+    for index, article in iter_news_summary_sentiment(company, limit, skip, use_gemini_ai):
+        articles.append((index, article))
+        sentiment_summary[article["Sentiment"]] += 1
+        job.update(stage="summarizing", articles_done=len(articles))
+
+    if len(articles) == 0:
+        raise RuntimeError("Sorry, no article found at the movement.")
+
+    return {
+        "Company": company,
+        # Search result order, same as /api/news/summarize
+        "Articles": [article for _, article in sorted(articles, key=lambda item: item[0])],
+        "Sentiment Distribution": sentiment_summary
+    }
+
+
+def run_insights_job(job, build, articles):
+    job.update(stage="generating", articles_total=len(articles))
+
+    status, data = build(articles)
+    if not status:
+        raise RuntimeError(data)
+
+    job.update(articles_done=len(articles))
+    # Result data will be in Markdown format
+    return {"data": data}
+
+
+def submit_job(kind, function, *args):
+    try:
+        job = job_manager.submit(kind, function, *args)
+    except QueueFullError as e:
+        return jsonify({"error": str(e)}), 429, {"Retry-After": "30"}
+
+    return jsonify({"JobId": job.id, "Status": job.status, "StatusUrl": f"/api/jobs/{job.id}"}), 202
+
+
+@app.route('/api/jobs/summarize', methods=['POST'])
+def create_news_job():
+    """ Same parameters as GET /api/news/summarize, as a JSON body or query string """
+    try:
+        params_status, params = parse_news_params(request.get_json(silent=True) or request.args)
+        if not params_status:
+            return jsonify({"error": params}), 400
+
+        return submit_job("summarize", run_news_job, *params)
+    except Exception as e:
+        return jsonify({"error": f"Failed to create the summarize job due to {e}"}), 500
+
+
+@app.route('/api/jobs/overview', methods=['POST'])
+def create_overview_job():
+    try:
+        articles_status, articles = validate_articles(request.get_json(silent=True))
+        if not articles_status:
+            return jsonify({"error": articles}), 400
+
+        return submit_job("overview", run_insights_job, build_overview, articles)
+    except Exception as e:
+        return jsonify({"error": f"Failed to create the overview job due to {e}"}), 500
+
+
+@app.route('/api/jobs/analysis', methods=['POST'])
+def create_analysis_job():
+    try:
+        articles_status, articles = validate_articles(request.get_json(silent=True))
+        if not articles_status:
+            return jsonify({"error": articles}), 400
+
+        return submit_job("analysis", run_insights_job, build_analysis, articles)
+    except Exception as e:
+        return jsonify({"error": f"Failed to create the analysis job due to {e}"}), 500
+
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found or its result has expired."}), 404
+
+    return jsonify(job.to_dict()), 200
+
+
+@app.route('/api/model/warmup', methods=['POST'])
+def warmup_model():
+    try:
+        was_loaded = summarizer_is_warm()
+        started_at = time.perf_counter()
+
+        warmup_summarizer()
+
+        return jsonify({
+            "data": "Summarization model is ready.",
+            "Loaded": not was_loaded,
+            "Seconds": round(time.perf_counter() - started_at, 2)
+        }), 200
+    except Exception as e:
+        return jsonify({"error": f"Failed to load summarization model due to {e}"}), 500
+
+
 # Load port value
 PORT = os.getenv("FLASK_PORT", "5000")
 
@@ -151,4 +321,12 @@ except ValueError:
     PORT = 5000
 
 if __name__ == '__main__':
+    # Background work starts here, not at import, so spawned summarizer workers and the debug reloader's watcher
+    # process skip it. BART is loaded lazily; deployments using it can load it in the background at startup instead.
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        if get_env_bool("SUMMARIZER_PRELOAD"):
+            threading.Thread(target=warmup_summarizer, name="summarizer-preload", daemon=True).start()
+
+        periodic_clean()
+
     app.run(debug=True, host="0.0.0.0", port=PORT)
@@ -1,7 +1,10 @@
 import gradio as gr
 from text_to_speech import generate_audio
-from utils import get_news_ui_css, markdown_to_plain_text, periodic_clean, analyze_company
-from summarizer import all_articles_summary_with_gemini, all_articles_comparative_analysis_with_gemini
+from utils import get_news_ui_css, periodic_clean, iter_analyze_company
+from summarizer import warmup_summarizer
+from insights import get_insights, insights_key, prefetch_insights, cancel_prefetch
+from config import get_env_bool
+import threading
 
 
 # Can be used for testing
@@ -58,27 +61,62 @@ def complete_ui():
                 submit_btn = gr.Button("Get News", elem_classes='btn__get_news', min_width=300)
                 reset_btn = gr.Button("Reset", min_width=300)
 
-        @gr.render(inputs=[company_name, max_articles, skip_value, use_gemini], triggers=[submit_btn.click])
-        def render_data(company_name_val, max_articles_val, skip_value_val, use_gemini_val):
+        # Snapshot from iter_analyze_company, updated while articles are summarized and their audio is generated
+        news_state = gr.State(value=None)
+
+        def load_news(company_name_val, max_articles_val, skip_value_val, use_gemini_val, request: gr.Request):
+            gr.Info(f"Hang tight... Loading articles related to {company_name_val}", duration=15)
+            cancel_prefetch(request.session_hash)
+            yield None
+
             try:
-                info_duration = 30 if use_gemini_val == "Yes" else 40
+                for news_data in iter_analyze_company(company_name_val, max_articles_val, skip_value_val,
+                                                      use_gemini_val):
+                    if news_data["Error"] is not None:
+                        gr.Warning(news_data["Error"])
+                    if news_data["Done"]:
+                        # With PREFETCH_INSIGHTS, the insight buttons attach to this background work
+                        prefetch_insights(request.session_hash, news_data["Articles"])
+                    yield news_data
+            except Exception as e:
+                gr.Warning(f"Something went wrong due to {e}")
+                yield None  # Clear the partly loaded list
 
-                gr.Info(f"Hang tight... Loading articles related to {company_name_val}",
-                        duration=max_articles_val * info_duration)
+        submit_btn.click(fn=load_news, inputs=[company_name, max_articles, skip_value, use_gemini],
+                         outputs=[news_state])
 
-                article_list, sentiment_summary, summary_audio = analyze_company(company_name_val, max_articles_val,
-                                                                                 skip_value_val, use_gemini_val)
+        def cancel_session_prefetch(request: gr.Request):
+            cancel_prefetch(request.session_hash)
 
-                if isinstance(article_list, str):
-                    gr.Warning(article_list)
+        news_ui.unload(fn=cancel_session_prefetch)
+
+        @gr.render(inputs=[news_state])
+        def render_data(news_data):
+            try:
+                if news_data is None or len(news_data["Articles"]) == 0:
                     return
 
+                article_list = news_data["Articles"]
+                sentiment_summary = news_data["SentimentSummary"]
+                done = news_data["Done"]
+
+                # Every snapshot re-runs this block; components whose key is unchanged stay mounted (an audio player
+                # keeps playing) and keep their previous value. Keys therefore include whatever their value depends
+                # on, so a component is only remounted when its content actually changes.
                 with gr.Tab(label="Articles"):
                     with gr.Row():
-                        overview_show_btn = gr.Button(value="Get Overall Insights & Summary", visible=True,
-                                                      min_width=300)
-                        comparative_analysis_btn = gr.Button(value="Get Comparative Analysis", visible=True,
-                                                             min_width=300)
+                        gr.Text(value=sentiment_summary, label="Sentiment Summary", interactive=False, min_width=300,
+                                scale=4, key=f"sentiment-summary-{sentiment_summary}")
+                        sentiment_audio = news_data["SentimentAudio"]
+                        gr.Audio(label="Sentiment Summary Audio", value=sentiment_audio, interactive=False,
+                                 visible=done, min_width=250, scale=6, key=f"sentiment-audio-{sentiment_audio}")
+
+                    # Insights need every article, so they are offered once all of them are summarized
+                    with gr.Row():
+                        overview_show_btn = gr.Button(value="Get Overall Insights & Summary", visible=done,
+                                                      min_width=300, key=f"overview-btn-{done}")
+                        comparative_analysis_btn = gr.Button(value="Get Comparative Analysis", visible=done,
+                                                             min_width=300, key=f"analysis-btn-{done}")
 
                     with gr.Column():
                         article_index = 0
@@ -89,17 +127,21 @@ def complete_ui():
                                         article = article_list[i + j]
                                         article_index += 1
                                         with gr.Column(min_width=500, variant='panel'):
+                                            # Articles are only ever appended, so index and URL identify them
                                             gr.HTML(f"""
                                                         <h3>
                                                             {article_index}. <a href="{article['URL']}" target="_blank">
                                                                 {article['Title']}
                                                             </a>
                                                         </h3>
-                                                    """)
+                                                    """, key=f"article-title-{article_index}-{article['URL']}")
                                             gr.Markdown(value=article['Summary'],
-                                                        show_copy_button=True, container=False, label="Summary")
-                                            gr.Audio(label="Summary Audio", value=article['Audio'], interactive=False,
-                                                     editable=False)
+                                                        show_copy_button=True, container=False, label="Summary",
+                                                        key=f"article-summary-{article_index}-{article['URL']}")
+                                            gr.Audio(label="Summary Audio" if article['Audio'] else
+                                                     "Summary Audio (generating...)",
+                                                     value=article['Audio'], interactive=False, editable=False,
+                                                     key=f"article-audio-{article_index}-{article['Audio']}")
 
                 with gr.Tab(label="Overall Insights & Summary", visible=False, elem_id="tab__overview"
                             ) as overview_tab:
@@ -177,11 +219,15 @@ def complete_ui():
                         analysis_failure_output = gr.Markdown()
 
                 # Get overall insights & summary
-                def tab_switched():
+                def tab_switched(prev_summarize_all_state):
                     gr.Info("Loading overall insights & summary...", duration=60)
-                    prev_summarize_all_state = {"Failed": False, "FailedMessage": None}
+                    if not isinstance(prev_summarize_all_state, dict):  # Nothing fetched yet in this session
+                        prev_summarize_all_state = {}
+                    overview_key = insights_key(article_list, "overview")
 
-                    if "DataFetched" in prev_summarize_all_state and prev_summarize_all_state["DataFetched"]:
+                    # Fetched before for exactly these articles (a new search changes the key)
+                    if (prev_summarize_all_state.get("DataFetched")
+                            and prev_summarize_all_state.get("Key") == overview_key):
                         gr.Info("Please switch to Overall Insights & Summary tab.")
                         return (
                             gr.update(visible=False),  # Overview btn visibility
@@ -194,8 +240,10 @@ def complete_ui():
                             gr.State(value=sentiment_summary),  # Sentiment summary
                             prev_summarize_all_state["FailedMessage"],  # Update failed message
                             # State variable
-                            gr.State(prev_summarize_all_state)
+                            prev_summarize_all_state
                         )
+
+                    prev_summarize_all_state = {"Failed": False, "FailedMessage": None, "Key": overview_key}
                     try:
                         if len(article_list) == 0:
                             prev_summarize_all_state["Failed"] = True
@@ -207,11 +255,9 @@ def complete_ui():
                             prev_summarize_all_state["AudioSummary"] = None
                             raise gr.Error(f"There no any articles fetched to provide overall insights.")
 
-                        joined_summary = "\n".join(
-                            f"{article_i['Title']} - {article_i['Summary']}" for article_i in article_list)
-
-                        all_summary_response_status, all_summary_response_data = all_articles_summary_with_gemini(
-                            joined_summary)
+                        # Memoized by article list, so repeated clicks and other sessions reuse the result and audio
+                        all_summary_response_status, all_summary_response_data = get_insights(article_list, "overview",
+                                                                                               with_audio=True)
 
                         if not all_summary_response_status:
                             prev_summarize_all_state["Failed"] = True
@@ -225,10 +271,9 @@ def complete_ui():
                         prev_summarize_all_state["FailedMessage"] = None
 
                         prev_summarize_all_state["DataFetched"] = all_summary_response_status
-                        prev_summarize_all_state["Data"] = all_summary_response_data
+                        prev_summarize_all_state["Data"] = all_summary_response_data["Markdown"]
 
-                        prev_summarize_all_state["AudioSummary"] = generate_audio(markdown_to_plain_text(
-                            all_summary_response_data))
+                        prev_summarize_all_state["AudioSummary"] = all_summary_response_data["Audio"]
 
                     except Exception as e:
                         prev_summarize_all_state_failed = prev_summarize_all_state.get("Failed", True)
@@ -253,11 +298,11 @@ def complete_ui():
                         gr.State(value=sentiment_summary),  # Sentiment summary
                         prev_summarize_all_state["FailedMessage"],  # Update failed message
                         # State variable
-                        gr.State(prev_summarize_all_state)
+                        prev_summarize_all_state
                     )
 
                 # Show overview tab and fetch required data
-                overview_show_btn.click(fn=tab_switched, inputs=[],
+                overview_show_btn.click(fn=tab_switched, inputs=[summarize_all_state],
                                         outputs=[
                                             overview_show_btn,  # Overview btn visibility
                                             overview_tab,  # Tab visibility
@@ -301,16 +346,21 @@ def complete_ui():
                         "AccordionData": None
                     }
 
-                # Unload gradio component
-                news_ui.unload(fn=unload_news_ui)
+                # Unload gradio component (registered once per search, not on every progressive render)
+                if done:
+                    news_ui.unload(fn=unload_news_ui)
 
                 # Fetch comparative analysis
-                def get_comparative_analysis_data():
+                def get_comparative_analysis_data(prev_comparative_analysis_state):
                     gr.Info("Loading comparative analysis...", duration=60)
-                    prev_comparative_analysis_state = {"Failed": False, "FailedMessage": None}
+                    if not isinstance(prev_comparative_analysis_state, dict):  # Nothing fetched yet in this session
+                        prev_comparative_analysis_state = {}
+                    analysis_key = insights_key(article_list, "analysis")
 
                     try:
-                        if "DataFetched" in prev_comparative_analysis_state and prev_comparative_analysis_state["DataFetched"]:
+                        # Fetched before for exactly these articles (a new search changes the key)
+                        if (prev_comparative_analysis_state.get("DataFetched")
+                                and prev_comparative_analysis_state.get("Key") == analysis_key):
                             gr.Info("Please switch to Comparative Analysis tab.")
                             return (
                                 gr.update(visible=False),  # Comparative analysis btn visibility
@@ -323,16 +373,14 @@ def complete_ui():
                                 prev_comparative_analysis_state["FailedMessage"],  # Update failed message
                                 prev_comparative_analysis_state["AccordionData"],  # Accordion data
                                 # State variable
-                                gr.State(prev_comparative_analysis_state)
+                                prev_comparative_analysis_state
                             )
 
-                        joined_summary = "\n".join(
-                            f"Article-{index + 1}: **{article_i['Title']}** - {article_i['Summary']}"
-                            for index, article_i in enumerate(article_list)
-                        )
+                        prev_comparative_analysis_state = {"Failed": False, "FailedMessage": None, "Key": analysis_key}
 
-                        ca_status, comparative_analysis_response_data = all_articles_comparative_analysis_with_gemini(
-                            joined_summary)
+                        # Memoized by article list, so repeated clicks and other sessions reuse the result and audio
+                        ca_status, comparative_analysis_response_data = get_insights(article_list, "analysis",
+                                                                                     with_audio=True)
 
                         if not ca_status:
                             prev_comparative_analysis_state["Failed"] = True
@@ -351,10 +399,9 @@ def complete_ui():
                         prev_comparative_analysis_state["FailedMessage"] = None
 
                         prev_comparative_analysis_state["DataFetched"] = ca_status
-                        prev_comparative_analysis_state["Data"] = comparative_analysis_response_data
+                        prev_comparative_analysis_state["Data"] = comparative_analysis_response_data["Markdown"]
 
-                        prev_comparative_analysis_state["AudioSummary"] = generate_audio(markdown_to_plain_text(
-                            comparative_analysis_response_data))
+                        prev_comparative_analysis_state["AudioSummary"] = comparative_analysis_response_data["Audio"]
 
                         prev_comparative_analysis_state["AccordionData"] = accordion_data if accordion_data else None
 
@@ -383,12 +430,12 @@ def complete_ui():
                         prev_comparative_analysis_state["FailedMessage"],  # Update failed message
                         prev_comparative_analysis_state["AccordionData"],  # Accordion data
                         # State variable
-                        gr.State(prev_comparative_analysis_state)
+                        prev_comparative_analysis_state
                     )
 
                 # Comparative analysis btn
                 comparative_analysis_btn.click(fn=get_comparative_analysis_data,
-                                               inputs=[],
+                                               inputs=[comparative_analysis_state],
                                                outputs=[
                                                    comparative_analysis_btn,  # Comparative analysis btn visibility
                                                    analysis_tab,  # Tab visibility
@@ -423,7 +470,9 @@ def complete_ui():
                 gr.Warning(f"Something went wrong due to {e}")
                 return
 
-        def reset_ui_for_new_search():
+        def reset_ui_for_new_search(request: gr.Request):
+            cancel_prefetch(request.session_hash)
+
             summarize_all_state_reset = {
                 "DataFetched": False,
                 "Data": None,
@@ -454,12 +503,17 @@ def complete_ui():
                 gr.update(visible=False),  # Hide the loading content
                 gr.update(visible=False),  # Hide the failure content
                 # State variables
-                gr.State(value=summarize_all_state_reset),
-                gr.State(comparative_analysis_state_reset),
+                summarize_all_state_reset,
+                comparative_analysis_state_reset,
             )
 
     news_ui.launch(share=True)
 
 
-complete_ui()
-# periodic_clean()
+# Spawned summarizer workers re-import this script as __mp_main__; only the real entry point builds the UI
+if __name__ == "__main__":
+    if get_env_bool("SUMMARIZER_PRELOAD"):
+        threading.Thread(target=warmup_summarizer, name="summarizer-preload", daemon=True).start()
+
+    periodic_clean()
+    complete_ui()
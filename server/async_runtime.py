@@ -0,0 +1,46 @@
+import asyncio
+import threading
+
+# One event loop for the whole process, running on its own daemon thread. Long-lived async clients
+# (httpx, googletrans) are bound to this loop, so every coroutine using them must run here.
+runtime_loop = None
+runtime_lock = threading.Lock()
+
+
+def get_loop():
+    """ The shared event loop, started on first use """
+    global runtime_loop
+
+    with runtime_lock:
+        if runtime_loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="async-runtime", daemon=True).start()
+            runtime_loop = loop
+        return runtime_loop
+
+
+def in_runtime_loop():
+    try:
+        return asyncio.get_running_loop() is runtime_loop
+    except RuntimeError:
+        return False
+
+
+def submit_coroutine(coroutine):
+    """ Schedule a coroutine on the shared loop from any thread; returns a concurrent.futures.Future """
+    return asyncio.run_coroutine_threadsafe(coroutine, get_loop())
+
+
+def run_coroutine(coroutine, timeout=None):
+    """ Run a coroutine on the shared loop and wait for its result. For synchronous code only. """
+    if in_runtime_loop():
+        coroutine.close()
+        # Blocking here would stop the loop the coroutine needs to run on
+        raise RuntimeError("run_coroutine() called from the async runtime loop; await the coroutine instead")
+
+    future = submit_coroutine(coroutine)
+    try:
+        return future.result(timeout)
+    except BaseException:
+        future.cancel()
+        raise
@@ -0,0 +1,181 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+INDEX_FILENAME = "index.json"
+
+
+class AudioStore:
+    """
+    Size and last-access index of the generated audio files, kept in memory (LRU order) and saved to
+    index.json in the audio directory. add() evicts the least recently used files once max_bytes is exceeded
+    and expire() drops files unused for max_age_secs, both without listing the directory. The directory is
+    scanned once at startup, and only when index.json is missing or older than the directory (files written
+    by another process or before a crash).
+    """
+
+    def __init__(self, directory, max_bytes, max_age_secs, save_interval_secs=30.0):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age_secs = max_age_secs
+        self.save_interval_secs = save_interval_secs
+        self.index_path = os.path.join(directory, INDEX_FILENAME)
+        self.entries = OrderedDict()  # filename -> [size, accessed_at], least recently used first
+        self.total_bytes = 0
+        self.dirty = False
+        self.saved_at = 0.0
+        self.lock = threading.Lock()
+        self.janitor = None
+
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    def _read_index(self):
+        """ Saved (filename, size, accessed_at) entries and whether they still match the directory """
+        try:
+            with open(self.index_path, encoding="utf-8") as file:
+                entries = json.load(file)
+            # Saving touches index.json after its rename, so any later file change makes the directory newer
+            up_to_date = os.path.getmtime(self.index_path) >= os.path.getmtime(self.directory)
+            return entries, up_to_date
+        except FileNotFoundError:
+            return [], False
+        except (OSError, ValueError) as e:
+            print(f"Warning: Audio index {self.index_path} is unreadable ({e}). Rebuilding it.")
+            return [], False
+
+    def _load_index(self):
+        entries, up_to_date = self._read_index()
+
+        if not up_to_date:
+            accessed = {filename: accessed_at for filename, _, accessed_at in entries}
+            entries = [(filename, size, accessed.get(filename, modified_at))
+                       for filename, size, modified_at in self._scan_directory()]
+            self.dirty = True
+
+        for filename, size, accessed_at in sorted(entries, key=lambda entry: entry[2]):
+            self.entries[filename] = [size, accessed_at]
+            self.total_bytes += size
+
+        with self.lock:
+            self._evict_over_cap()
+
+    def _scan_directory(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".mp3") and entry.is_file():
+                stat = entry.stat()
+                entries.append((entry.name, stat.st_size, stat.st_mtime))
+        return entries
+
+    def _evict_over_cap(self):
+        while self.max_bytes > 0 and self.total_bytes > self.max_bytes and len(self.entries) > 1:
+            self._remove(next(iter(self.entries)))
+
+    def lookup(self, path):
+        """ True if the file is stored; marks it as just used """
+        filename = os.path.basename(path)
+        with self.lock:
+            entry = self.entries.get(filename)
+            if entry is None:
+                return False
+
+            if not os.path.isfile(path):
+                # Removed behind our back
+                self._forget(filename)
+                return False
+
+            entry[1] = time.time()
+            self.entries.move_to_end(filename)
+            self.dirty = True
+
+        self._save_if_due()
+        return True
+
+    def add(self, path):
+        """ Record a newly written file, then evict least recently used files beyond max_bytes """
+        filename = os.path.basename(path)
+        size = os.path.getsize(path)
+
+        with self.lock:
+            self._forget(filename)
+            self.entries[filename] = [size, time.time()]
+            self.total_bytes += size
+            self.dirty = True
+            self._evict_over_cap()
+
+        self._save_if_due()
+
+    def expire(self, max_age_secs=None):
+        """ Remove files not used for max_age_secs; only the expired entries are visited """
+        expires_before = time.time() - (self.max_age_secs if max_age_secs is None else max_age_secs)
+
+        with self.lock:
+            while self.entries:
+                filename, (_, accessed_at) = next(iter(self.entries.items()))
+                if accessed_at >= expires_before:
+                    break
+                self._remove(filename)
+
+        self._save_if_due()
+
+    def _save_if_due(self):
+        # Saved on changes, at most every save_interval_secs, so a killed process loses little of the index
+        if self.dirty and time.monotonic() - self.saved_at >= self.save_interval_secs:
+            self.save_index()
+
+    def save_index(self):
+        with self.lock:
+            if not self.dirty:
+                return
+            entries = [(filename, size, accessed_at) for filename, (size, accessed_at) in self.entries.items()]
+            self.dirty = False
+            self.saved_at = time.monotonic()
+
+        temp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as file:
+                json.dump(entries, file)
+            os.replace(temp_path, self.index_path)
+            os.utime(self.index_path)  # Newer than the directory change the rename itself made
+        except OSError as e:
+            print(f"Error: Failed to save audio index due to {e}")
+            self.dirty = True
+
+    def start_janitor(self, interval_secs):
+        """
+        One long-lived daemon thread that expires old files and saves the index every interval_secs,
+        working from the in-memory index only
+        """
+        with self.lock:
+            if self.janitor is not None:
+                return
+            self.janitor = threading.Thread(target=self._run_janitor, args=(interval_secs,), name="audio-janitor",
+                                            daemon=True)
+        self.janitor.start()
+
+    def _run_janitor(self, interval_secs):
+        while True:
+            try:
+                self.expire()
+                self.save_index()
+            except Exception as e:
+                print(f"Error: Audio cleanup failed due to {e}")
+            time.sleep(interval_secs)
+
+    def _forget(self, filename):
+        entry = self.entries.pop(filename, None)
+        if entry is not None:
+            self.total_bytes -= entry[0]
+            self.dirty = True
+
+    def _remove(self, filename):
+        self._forget(filename)
+        try:
+            os.remove(os.path.join(self.directory, filename))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"Error: Failed to remove audio file {filename} due to {e}")
@@ -0,0 +1,130 @@
+"""
+Parity and speed of the summarizer backends (SUMMARIZER_BACKEND) against the fp32 torch baseline.
+
+Each backend runs in its own process so load time and memory are measured in isolation.
+Reported per backend: load seconds, resident memory after load, mean latency per chunk and
+ROUGE-1 / ROUGE-L F1 of its summaries against the torch summaries of the same chunks.
+
+    python benchmarks/bench_backends.py --backends torch,int8,onnx --max-chunks 8
+"""
+import argparse
+import multiprocessing
+import re
+import time
+from collections import Counter
+from common import CORPUS_DIR, load_corpus, page_text
+
+
+def rouge_1(reference, candidate):
+    reference_words, candidate_words = Counter(reference), Counter(candidate)
+    overlap = sum((reference_words & candidate_words).values())
+    if overlap == 0:
+        return 0.0
+    precision, recall = overlap / len(candidate), overlap / len(reference)
+    return 2 * precision * recall / (precision + recall)
+
+
+def rouge_l(reference, candidate):
+    # Longest common subsequence, one row at a time
+    previous = [0] * (len(candidate) + 1)
+    for reference_word in reference:
+        current = [0]
+        for position, candidate_word in enumerate(candidate):
+            if reference_word == candidate_word:
+                current.append(previous[position] + 1)
+            else:
+                current.append(max(previous[position + 1], current[position]))
+        previous = current
+
+    lcs = previous[-1]
+    if lcs == 0:
+        return 0.0
+    precision, recall = lcs / len(candidate), lcs / len(reference)
+    return 2 * precision * recall / (precision + recall)
+
+
+def words(text):
+    return re.findall(r"\w+", text.lower())
+
+
+def run_backend(backend, chunk_inputs):
+    """ Runs in a fresh process: load the backend, summarize every chunk, report timings and memory """
+    import psutil
+    from model_loader import LazyModel
+    from summarizer import model_name
+
+    process = psutil.Process()
+    rss_before = process.memory_info().rss
+
+    lazy_model = LazyModel(model_name, backend=backend)
+    started_at = time.perf_counter()
+    lazy_model.warmup()
+    load_secs = time.perf_counter() - started_at
+    rss_loaded = process.memory_info().rss
+
+    summaries, latencies = [], []
+    with lazy_model.use() as (tokenizer, model):
+        for text in chunk_inputs:
+            started_at = time.perf_counter()
+            inputs = tokenizer(text, return_tensors="pt", truncation=True, max_length=1000)
+            summary_ids = model.generate(**inputs, max_length=1000, min_length=25, do_sample=False)
+            summaries.append(tokenizer.decode(summary_ids[0], skip_special_tokens=True))
+            latencies.append(time.perf_counter() - started_at)
+
+    return {
+        "load_secs": load_secs,
+        "rss_mb": (rss_loaded - rss_before) / 1024 / 1024,
+        "peak_rss_mb": process.memory_info().rss / 1024 / 1024,
+        "latencies": latencies,
+        "summaries": summaries
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=CORPUS_DIR)
+    parser.add_argument("--backends", default="torch,int8,onnx")
+    parser.add_argument("--max-chunks", type=int, default=8)
+    args = parser.parse_args()
+
+    import summarizer
+
+    chunk_inputs = []
+    for name, html in load_corpus(args.corpus):
+        chunk_inputs.extend(f"{name} - {chunk}" for chunk in summarizer.split_text_by_tokens(page_text(html)))
+    chunk_inputs = chunk_inputs[:args.max_chunks]
+    print(f"{len(chunk_inputs)} chunks")
+
+    backends = [backend.strip() for backend in args.backends.split(",")]
+    if "torch" not in backends:
+        backends.insert(0, "torch")
+
+    context = multiprocessing.get_context("spawn")
+    results = {}
+    for backend in backends:
+        with context.Pool(1) as pool:
+            try:
+                results[backend] = pool.apply(run_backend, (backend, chunk_inputs))
+            except Exception as e:
+                print(f"{backend}: failed due to {e}")
+
+    baseline = results.get("torch")
+    if baseline is None:
+        raise SystemExit("The torch baseline failed, nothing to compare against.")
+
+    baseline_latency = sum(baseline["latencies"]) / len(baseline["latencies"])
+    print(f"{'backend':<8} {'load s':>7} {'model MB':>9} {'peak MB':>8} {'s/chunk':>8} {'speedup':>8} "
+          f"{'ROUGE-1':>8} {'ROUGE-L':>8}")
+    for backend, result in results.items():
+        latency = sum(result["latencies"]) / len(result["latencies"])
+        pairs = [(words(reference), words(candidate))
+                 for reference, candidate in zip(baseline["summaries"], result["summaries"])]
+        rouge_1_f1 = sum(rouge_1(reference, candidate) for reference, candidate in pairs) / len(pairs)
+        rouge_l_f1 = sum(rouge_l(reference, candidate) for reference, candidate in pairs) / len(pairs)
+
+        print(f"{backend:<8} {result['load_secs']:>7.1f} {result['rss_mb']:>9.0f} {result['peak_rss_mb']:>8.0f} "
+              f"{latency:>8.2f} {baseline_latency / latency:>7.2f}x {rouge_1_f1:>8.3f} {rouge_l_f1:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
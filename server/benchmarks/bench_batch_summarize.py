@@ -0,0 +1,52 @@
+"""
+Throughput of batched BART summarization for different batch sizes.
+
+Every corpus page is chunked like a real request and all chunks are summarized together
+with summarize_batch (the summary cache is bypassed), once per batch size.
+
+    python benchmarks/bench_batch_summarize.py --batch-sizes 1,2,4,8 --max-chunks 16
+"""
+import argparse
+import time
+from common import CORPUS_DIR, load_corpus, page_text
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=CORPUS_DIR)
+    parser.add_argument("--batch-sizes", default="1,2,4,8")
+    parser.add_argument("--max-chunks", type=int, default=16, help="Limit chunks per run to bound the run time")
+    args = parser.parse_args()
+
+    import summarizer
+
+    chunk_inputs = []
+    for name, html in load_corpus(args.corpus):
+        chunk_inputs.extend(f"{name} - {chunk}" for chunk in summarizer.split_text_by_tokens(page_text(html)))
+    chunk_inputs = chunk_inputs[:args.max_chunks]
+
+    encoded = summarizer.summarizer_model.get_tokenizer()(chunk_inputs, truncation=True, max_length=1000)
+    lengths = sorted(len(ids) for ids in encoded["input_ids"])
+    print(f"{len(chunk_inputs)} chunks, {min(lengths)}-{max(lengths)} tokens each")
+
+    # Load the model and warm up kernels and allocator before timing
+    summarizer.summarize_batch(chunk_inputs[:1], batch_size=1)
+
+    baseline = None
+    print(f"{'batch size':>10} {'seconds':>9} {'chunks/s':>9} {'speedup':>8} {'padding':>8}")
+    for batch_size in [int(value) for value in args.batch_sizes.split(",")]:
+        # Padding overhead of length sorted batches: padded tokens over real tokens
+        padded = sum(max(lengths[start:start + batch_size]) * len(lengths[start:start + batch_size])
+                     for start in range(0, len(lengths), batch_size))
+
+        started_at = time.perf_counter()
+        summarizer.summarize_batch(chunk_inputs, batch_size=batch_size)
+        elapsed = time.perf_counter() - started_at
+
+        baseline = baseline or elapsed
+        print(f"{batch_size:>10} {elapsed:>9.2f} {len(chunk_inputs) / elapsed:>9.2f} {baseline / elapsed:>7.2f}x "
+              f"{padded / sum(lengths) - 1:>7.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Generate calls needed per article with the character based split_text versus the token budget chunker.
+
+Only the tokenizer is loaded, no summaries are generated. Calls are counted as one generate per
+chunk plus the reduce step, and also with SUMMARIZER_BATCH_SIZE batching.
+
+    python benchmarks/bench_chunker.py --corpus benchmarks/corpus
+"""
+import argparse
+import math
+import time
+from common import CORPUS_DIR, load_corpus, page_text
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=CORPUS_DIR)
+    args = parser.parse_args()
+
+    import summarizer
+
+    tokenizer = summarizer.summarizer_model.get_tokenizer()
+    batch_size = summarizer.SUMMARIZER_BATCH_SIZE
+
+    totals = {"chars": [0, 0, 0.0], "tokens": [0, 0, 0.0]}
+    print(f"{'page':<40} {'char chunks':>11} {'token chunks':>12} {'char ms':>8} {'token ms':>9}")
+    for name, html in load_corpus(args.corpus):
+        text = page_text(html)
+        reserved_tokens = len(tokenizer(f"{name} - ")["input_ids"])
+
+        started_at = time.perf_counter()
+        char_chunks = summarizer.split_text(text, max_chars=1000)
+        char_ms = (time.perf_counter() - started_at) * 1000
+
+        started_at = time.perf_counter()
+        token_chunks = list(summarizer.split_text_by_tokens(text, reserved_tokens=reserved_tokens))
+        token_ms = (time.perf_counter() - started_at) * 1000
+
+        for key, chunks, elapsed in (("chars", char_chunks, char_ms), ("tokens", token_chunks, token_ms)):
+            totals[key][0] += len(chunks) + 1
+            totals[key][1] += math.ceil(len(chunks) / batch_size) + 1
+            totals[key][2] += elapsed
+
+        print(f"{name[:40]:<40} {len(char_chunks):>11} {len(token_chunks):>12} {char_ms:>8.1f} {token_ms:>9.1f}")
+
+    char_calls, char_batched, _ = totals["chars"]
+    token_calls, token_batched, _ = totals["tokens"]
+    print(f"\ngenerate calls (chunks + reduce): {char_calls} -> {token_calls} "
+          f"({1 - token_calls / char_calls:.0%} fewer)")
+    print(f"batched generate calls (batch size {batch_size}): {char_batched} -> {token_batched} "
+          f"({1 - token_batched / char_batched:.0%} fewer)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Tokens per article sent to the summarizers before (full page text) and after main-content extraction.
+
+    python benchmarks/bench_extraction.py --corpus benchmarks/corpus
+    python benchmarks/bench_extraction.py --words   # whitespace words, no tokenizer download
+"""
+import argparse
+import time
+from bs4 import BeautifulSoup
+from common import CORPUS_DIR, load_corpus
+from content_extractor import extract_main_text
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=CORPUS_DIR)
+    parser.add_argument("--words", action="store_true", help="Count whitespace separated words instead of tokens")
+    args = parser.parse_args()
+
+    if args.words:
+        def count_tokens(text):
+            return len(text.split())
+    else:
+        from summarizer import summarizer_model
+
+        tokenizer = summarizer_model.get_tokenizer()
+
+        def count_tokens(text):
+            return len(tokenizer(text, add_special_tokens=False, verbose=False)["input_ids"])
+
+    total_before, total_after = 0, 0
+    print(f"{'page':<40} {'full page':>10} {'extracted':>10} {'reduction':>10} {'extract ms':>11}")
+    for name, html in load_corpus(args.corpus):
+        soup = BeautifulSoup(html, "html.parser")
+
+        started_at = time.perf_counter()
+        main_text = extract_main_text(soup)
+        elapsed_ms = (time.perf_counter() - started_at) * 1000
+
+        before, after = count_tokens(soup.text), count_tokens(main_text)
+        total_before += before
+        total_after += after
+        print(f"{name[:40]:<40} {before:>10} {after:>10} {before / max(after, 1):>9.1f}x {elapsed_ms:>11.1f}")
+
+    print(f"\ntotal: {total_before} -> {total_after} tokens ({total_before / max(total_after, 1):.1f}x fewer)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Per-article Gemini prompts versus JSON batch prompts (GEMINI_BATCH_TOKENS) against the local fake
+Gemini server. Reported per mode: wall time, requests sent (articles missing from an incomplete or
+unparsable batch response are retried on their own and show up as extra requests), 429 responses and
+articles left without a summary.
+
+    python benchmarks/bench_gemini_batch.py --articles 12 --batch-tokens 8000
+    python benchmarks/bench_gemini_batch.py --articles 12 --server-rpm 15 --client-rpm 15
+    python benchmarks/bench_gemini_batch.py --articles 12 --json-drop-rate 0.1 --json-garble-rate 0.2
+"""
+import argparse
+import json
+import os
+import time
+import urllib.request
+from common import CORPUS_DIR, load_corpus, page_text
+from fake_gemini_server import FakeGeminiServer
+
+
+def read_stats(server):
+    with urllib.request.urlopen(f"{server.base_url}/stats") as response:
+        return json.load(response)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=CORPUS_DIR)
+    parser.add_argument("--articles", type=int, default=12)
+    parser.add_argument("--batch-tokens", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.8, help="Fake server seconds per request")
+    parser.add_argument("--latency-per-1k-tokens", type=float, default=0.05)
+    parser.add_argument("--server-rpm", type=int, default=0, help="Fake server quota (0 = unlimited)")
+    parser.add_argument("--client-rpm", type=int, default=600, help="GEMINI_RPM used by the client")
+    parser.add_argument("--json-drop-rate", type=float, default=0.0)
+    parser.add_argument("--json-garble-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = FakeGeminiServer(latency_secs=args.latency, rpm=args.server_rpm,
+                              latency_per_1k_tokens=args.latency_per_1k_tokens, json_drop_rate=args.json_drop_rate,
+                              json_garble_rate=args.json_garble_rate).start()
+
+    # gemini_client reads these when it is imported / first used
+    os.environ["GEMINI_BASE_URL"] = server.base_url
+    os.environ["GEMINI_AI_API_KEY"] = "fake-key"
+    os.environ["GEMINI_RPM"] = str(args.client_rpm)
+    os.environ["GEMINI_RETRY_BASE_SECS"] = "0.2"
+
+    import gemini_client
+    import summarizer
+
+    pages = [(name, page_text(html)) for name, html in load_corpus(args.corpus)]
+    articles = [pages[index % len(pages)] for index in range(args.articles)]
+    article_tokens = sum(gemini_client.estimate_prompt_tokens(f"{title}\n{text}") for title, text in articles)
+    batches = summarizer.pack_gemini_batches(articles, args.batch_tokens)
+    print(f"{len(articles)} articles, ~{article_tokens} tokens, {len(batches)} batches of at most "
+          f"{args.batch_tokens} tokens")
+
+    print(f"{'mode':<10} {'seconds':>8} {'requests':>9} {'429s':>6} {'failed':>7}")
+    for mode, batch_tokens in (("article", 0), ("batch", args.batch_tokens)):
+        before = read_stats(server)
+        started_at = time.perf_counter()
+
+        results = summarizer.summarize_articles_with_gemini(articles, batch_tokens=batch_tokens)
+
+        elapsed = time.perf_counter() - started_at
+        after = read_stats(server)
+        failed = sum("Failed to summarize article" in result["Summary"] for result in results)
+
+        print(f"{mode:<10} {elapsed:>8.2f} {after['requests'] - before['requests']:>9} "
+              f"{after['rate_limited'] - before['rate_limited']:>6} {failed:>7}")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
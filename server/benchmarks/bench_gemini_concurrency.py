@@ -0,0 +1,74 @@
+"""
+Per-article Gemini summaries one after another versus concurrently (summarize_articles_with_gemini),
+against the local fake Gemini server, so no API key or network is needed.
+
+The client side rate limits and 429 retries are active: set --client-rpm below --server-rpm to see
+requests paced by the token bucket, or above it to see 429 responses being retried.
+
+    python benchmarks/bench_gemini_concurrency.py --articles 12 --latency 0.5
+    python benchmarks/bench_gemini_concurrency.py --articles 12 --server-rpm 10 --client-rpm 60
+"""
+import argparse
+import json
+import os
+import time
+import urllib.request
+from common import CORPUS_DIR, load_corpus, page_text
+from fake_gemini_server import FakeGeminiServer
+
+
+def read_stats(server):
+    with urllib.request.urlopen(f"{server.base_url}/stats") as response:
+        return json.load(response)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=CORPUS_DIR)
+    parser.add_argument("--articles", type=int, default=12)
+    parser.add_argument("--latency", type=float, default=0.5, help="Fake server seconds per request")
+    parser.add_argument("--server-rpm", type=int, default=0, help="Fake server quota (0 = unlimited)")
+    parser.add_argument("--client-rpm", type=int, default=600, help="GEMINI_RPM used by the client")
+    args = parser.parse_args()
+
+    server = FakeGeminiServer(latency_secs=args.latency, rpm=args.server_rpm).start()
+
+    # gemini_client reads these when it is imported / first used
+    os.environ["GEMINI_BASE_URL"] = server.base_url
+    os.environ["GEMINI_AI_API_KEY"] = "fake-key"
+    os.environ["GEMINI_RPM"] = str(args.client_rpm)
+    os.environ["GEMINI_RETRY_BASE_SECS"] = "0.2"
+
+    import summarizer
+
+    pages = [(name, page_text(html)) for name, html in load_corpus(args.corpus)]
+    articles = [pages[index % len(pages)] for index in range(args.articles)]
+    print(f"{len(articles)} articles, {args.latency}s fake latency, client {args.client_rpm} RPM, "
+          f"server {args.server_rpm or 'unlimited'} RPM")
+
+    print(f"{'mode':<12} {'seconds':>8} {'articles/s':>11} {'requests':>9} {'429s':>6} {'peak in flight':>15}")
+    for mode in ("sequential", "concurrent"):
+        before = read_stats(server)
+        started_at = time.perf_counter()
+
+        if mode == "sequential":
+            results = [summarizer.summarize_article_content_with_gemini(title, text) for title, text in articles]
+        else:
+            results = summarizer.summarize_articles_with_gemini(articles)
+
+        elapsed = time.perf_counter() - started_at
+        after = read_stats(server)
+        failed = sum("Failed to summarize article" in result["Summary"] for result in results)
+
+        print(f"{mode:<12} {elapsed:>8.2f} {len(articles) / elapsed:>11.2f} "
+              f"{after['requests'] - before['requests']:>9} {after['rate_limited'] - before['rate_limited']:>6} "
+              f"{after['peak_in_flight']:>15}" + (f"  ({failed} failed)" if failed else ""))
+
+        # Peak concurrency is a high-water mark; reset it between modes
+        server.stats["peak_in_flight"] = 0
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
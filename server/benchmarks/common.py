@@ -0,0 +1,33 @@
+import os
+import sys
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+SERVER_DIR = os.path.dirname(BENCHMARKS_DIR)
+
+# Benchmarks are run as scripts (python benchmarks/<name>.py), so make the server modules importable
+if SERVER_DIR not in sys.path:
+    sys.path.insert(0, SERVER_DIR)
+
+CORPUS_DIR = os.path.join(BENCHMARKS_DIR, "corpus")
+
+
+def load_corpus(corpus_dir=CORPUS_DIR):
+    """ Return (name, html) for every saved .html page in the corpus directory """
+    pages = []
+    for filename in sorted(os.listdir(corpus_dir)):
+        if filename.endswith(".html"):
+            with open(os.path.join(corpus_dir, filename), encoding="utf-8") as file:
+                pages.append((filename, file.read()))
+
+    if len(pages) == 0:
+        raise SystemExit(f"No .html pages found in {corpus_dir}. Use save_corpus.py to save some articles.")
+
+    return pages
+
+
+def page_text(html):
+    """ Article text the way fetch_article_html extracts it """
+    from bs4 import BeautifulSoup
+    from content_extractor import extract_main_text
+
+    return extract_main_text(BeautifulSoup(html, "html.parser"))
@@ -0,0 +1,159 @@
+"""
+Local stand-in for the Gemini generateContent REST endpoint, to exercise the Gemini code paths offline.
+
+Every request waits --latency seconds (plus --latency-per-1k-tokens for long prompts) and returns a short
+canned summary. JSON requests (response_mime_type application/json) with <article id="N"> blocks get a
+JSON list of {"id", "summary"}; --json-drop-rate leaves articles out of it and --json-garble-rate returns
+unparsable JSON, to exercise the batch fallbacks. With --rpm the server enforces a requests-per-minute
+quota like the real API and answers 429 RESOURCE_EXHAUSTED beyond it.
+GET /stats returns request, 429 and peak concurrency counters.
+
+    python benchmarks/fake_gemini_server.py --port 8765 --latency 0.5 --rpm 60
+    GEMINI_BASE_URL=http://127.0.0.1:8765 GEMINI_AI_API_KEY=fake python api.py
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+GENERATE_PATH = re.compile(r"/models/([^/:]+):generateContent")
+ARTICLE_BLOCK = re.compile(r'<article id="(\d+)">(.*?)</article>', re.S)
+
+
+class FakeGeminiServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port=0, latency_secs=0.5, rpm=0, latency_per_1k_tokens=0.0, json_drop_rate=0.0,
+                 json_garble_rate=0.0, seed=0):
+        super().__init__(("127.0.0.1", port), FakeGeminiHandler)
+        self.latency_secs = latency_secs
+        self.latency_per_1k_tokens = latency_per_1k_tokens
+        self.rpm = rpm
+        self.json_drop_rate = json_drop_rate
+        self.json_garble_rate = json_garble_rate
+        self.random = random.Random(seed)
+        self.request_times = deque()
+        self.stats = {"requests": 0, "rate_limited": 0, "in_flight": 0, "peak_in_flight": 0}
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_port}"
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, name="fake-gemini", daemon=True).start()
+        return self
+
+    def admit(self):
+        """ Count the request; False when it is over the RPM quota """
+        now = time.monotonic()
+        with self.lock:
+            self.stats["requests"] += 1
+            while self.request_times and now - self.request_times[0] >= 60:
+                self.request_times.popleft()
+
+            if self.rpm > 0 and len(self.request_times) >= self.rpm:
+                self.stats["rate_limited"] += 1
+                return False
+
+            self.request_times.append(now)
+            self.stats["in_flight"] += 1
+            self.stats["peak_in_flight"] = max(self.stats["peak_in_flight"], self.stats["in_flight"])
+            return True
+
+    def release(self):
+        with self.lock:
+            self.stats["in_flight"] -= 1
+
+
+def fake_summary(prompt):
+    text = prompt.split("text:", 1)[-1]
+    return "Fake summary: " + " ".join(text.split()[:25])
+
+
+def fake_batch_summaries(prompt, server):
+    summaries = []
+    for article_id, article in ARTICLE_BLOCK.findall(prompt):
+        with server.lock:
+            dropped = server.random.random() < server.json_drop_rate
+        if not dropped:
+            summaries.append({"id": int(article_id), "summary": fake_summary(article)})
+
+    with server.lock:
+        garbled = server.random.random() < server.json_garble_rate
+    text = json.dumps(summaries)
+    return text[:len(text) // 2] if garbled else text
+
+
+class FakeGeminiHandler(BaseHTTPRequestHandler):
+    def send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=UTF-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/stats":
+            with self.server.lock:
+                stats = dict(self.server.stats)
+            self.send_json(200, stats)
+            return
+        self.send_json(404, {"error": {"code": 404, "message": "Not found", "status": "NOT_FOUND"}})
+
+    def do_POST(self):
+        request_body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+        if not GENERATE_PATH.search(self.path):
+            self.send_json(404, {"error": {"code": 404, "message": "Not found", "status": "NOT_FOUND"}})
+            return
+
+        if not self.server.admit():
+            self.send_json(429, {"error": {"code": 429, "message": "Resource has been exhausted (e.g. check quota).",
+                                           "status": "RESOURCE_EXHAUSTED"}})
+            return
+
+        try:
+            request_json = json.loads(request_body)
+            contents = request_json.get("contents", [])
+            prompt = " ".join(part.get("text", "") for content in contents for part in content.get("parts", []))
+            time.sleep(self.server.latency_secs + self.server.latency_per_1k_tokens * len(prompt) / 4000)
+
+            json_output = request_json.get("generationConfig", {}).get("responseMimeType") == "application/json"
+            text = fake_batch_summaries(prompt, self.server) if json_output else fake_summary(prompt)
+
+            self.send_json(200, {
+                "candidates": [{"content": {"parts": [{"text": text}], "role": "model"}, "finishReason": "STOP"}],
+                "usageMetadata": {"promptTokenCount": len(prompt) // 4, "candidatesTokenCount": len(text) // 4}
+            })
+        finally:
+            self.server.release()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.5, help="Seconds per generateContent call")
+    parser.add_argument("--latency-per-1k-tokens", type=float, default=0.0, help="Extra seconds per 1000 prompt tokens")
+    parser.add_argument("--rpm", type=int, default=0, help="Requests per minute before 429 (0 = unlimited)")
+    parser.add_argument("--json-drop-rate", type=float, default=0.0, help="Share of articles left out of JSON batches")
+    parser.add_argument("--json-garble-rate", type=float, default=0.0, help="Share of unparsable JSON batch responses")
+    args = parser.parse_args()
+
+    server = FakeGeminiServer(args.port, latency_secs=args.latency, rpm=args.rpm,
+                              latency_per_1k_tokens=args.latency_per_1k_tokens, json_drop_rate=args.json_drop_rate,
+                              json_garble_rate=args.json_garble_rate)
+    print(f"Fake Gemini listening on {server.base_url}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
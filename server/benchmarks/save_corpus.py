@@ -0,0 +1,43 @@
+"""
+Save the static article pages found for a company into the benchmark corpus.
+
+    python benchmarks/save_corpus.py "Tesla" --max-articles 10
+"""
+import argparse
+import hashlib
+import os
+from common import CORPUS_DIR
+from document_store import DocumentStore
+from model import get_google_news_links, is_static_page
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("company")
+    parser.add_argument("--max-articles", type=int, default=10)
+    parser.add_argument("--corpus", default=CORPUS_DIR)
+    args = parser.parse_args()
+
+    os.makedirs(args.corpus, exist_ok=True)
+    document_store = DocumentStore()
+    saved = 0
+
+    for url in get_google_news_links(args.company, max_articles=args.max_articles * 2):
+        if saved >= args.max_articles:
+            break
+
+        if not is_static_page(url, document_store):
+            continue
+
+        filename = f"{hashlib.sha256(url.encode('utf-8')).hexdigest()[:16]}.html"
+        with open(os.path.join(args.corpus, filename), "w", encoding="utf-8") as file:
+            file.write(f"<!-- {url} -->\n{document_store.get(url).html}")
+
+        saved += 1
+        print(f"Saved {url} -> {filename}")
+
+    print(f"Saved {saved} articles to {args.corpus}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def get_env_int(name, default):
+    """ Read an integer environment variable, falling back to default when missing or invalid """
+    value = os.getenv(name)
+
+    if value is None or value.strip() == "":
+        return default
+
+    try:
+        return int(value)
+    except ValueError:
+        print(f"Warning: Invalid {name} environment variable. Using default.")
+        return default
+
+
+def get_env_float(name, default):
+    """ Read a float environment variable, falling back to default when missing or invalid """
+    value = os.getenv(name)
+
+    if value is None or value.strip() == "":
+        return default
+
+    try:
+        return float(value)
+    except ValueError:
+        print(f"Warning: Invalid {name} environment variable. Using default.")
+        return default
+
+
+def get_env_bool(name, default=False):
+    """ Read a boolean environment variable ("true"/"1"/"yes" are truthy) """
+    value = os.getenv(name)
+
+    if value is None or value.strip() == "":
+        return default
+
+    return value.strip().lower() in ("true", "1", "yes")
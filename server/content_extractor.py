@@ -0,0 +1,151 @@
+import re
+from bs4 import Comment, Doctype, Tag
+
+# Never part of the article body
+BOILERPLATE_TAGS = {"script", "style", "noscript", "template", "svg", "iframe", "form", "button", "input",
+                    "select", "nav", "header", "footer", "aside", "head", "title", "meta", "link"}
+
+# class / id words of navigation, banners, share bars, related links ...
+NEGATIVE_WORDS = {"nav", "navbar", "menu", "footer", "header", "masthead", "cookie", "cookies", "consent", "banner",
+                  "subscribe", "newsletter", "related", "share", "social", "comment", "comments", "promo", "ad",
+                  "ads", "advert", "advertisement", "sponsored", "sidebar", "trending", "ticker", "breadcrumb",
+                  "breadcrumbs", "popup", "modal", "tags", "signup", "outbrain", "taboola"}
+
+# ... and of the article itself
+POSITIVE_WORDS = {"article", "story", "content", "body", "main", "post", "entry", "text", "news", "blog"}
+
+TEXT_BLOCK_TAGS = ["p", "h2", "h3", "h4", "li", "blockquote", "pre"]
+
+HINT_SPLIT = re.compile(r"[\s_\-]+")
+
+# Fall back to the cleaned full page when the winning block is shorter than this
+MIN_ARTICLE_CHARS = 250
+
+
+def _hint_words(tag):
+    hints = " ".join(tag.get("class", [])) + " " + (tag.get("id") or "")
+    return set(HINT_SPLIT.split(hints.lower()))
+
+
+def _class_weight(tag):
+    words = _hint_words(tag)
+    weight = 0
+    if words & NEGATIVE_WORDS:
+        weight -= 25
+    if words & POSITIVE_WORDS:
+        weight += 25
+    return weight
+
+
+def _is_boilerplate(tag, cache):
+    key = id(tag)
+    if key not in cache:
+        words = _hint_words(tag)
+        cache[key] = tag.name in BOILERPLATE_TAGS or bool(words & NEGATIVE_WORDS and not words & POSITIVE_WORDS)
+    return cache[key]
+
+
+def _inside_boilerplate(element, root, cache):
+    for parent in element.parents:
+        if parent is root or parent is None:
+            return False
+        if _is_boilerplate(parent, cache):
+            return True
+    return False
+
+
+def _link_density(tag):
+    text_length = len(tag.get_text(strip=True))
+    if text_length == 0:
+        return 1.0
+    link_length = sum(len(link.get_text(strip=True)) for link in tag.find_all("a"))
+    return link_length / text_length
+
+
+def _visible_text(root, cache):
+    """ All text under root except scripts, comments and boilerplate sections """
+    parts = []
+    for string in root.find_all(string=True):
+        if isinstance(string, (Comment, Doctype)) or not string.strip():
+            continue
+        if _inside_boilerplate(string, root, cache):
+            continue
+        parts.append(string.strip())
+    return "\n".join(parts)
+
+
+def _block_text(root, cache):
+    """ Text of the paragraph-like blocks under root, one block per line """
+    blocks, collected = [], set()
+    for block in root.find_all(TEXT_BLOCK_TAGS):
+        if any(id(parent) in collected for parent in block.parents):
+            continue
+        if _inside_boilerplate(block, root, cache):
+            continue
+
+        text = " ".join(block.get_text().split())
+        if not text or (block.name == "li" and _link_density(block) > 0.5):
+            continue
+
+        collected.add(id(block))
+        blocks.append(text)
+
+    return "\n".join(blocks) if blocks else _visible_text(root, cache)
+
+
+def extract_main_text(soup):
+    """
+    Readability-style article body extraction. Paragraphs score their parent and grandparent by
+    length and commas, candidates are weighted by class/id hints and penalised by link density,
+    and the best candidate plus its strong siblings is returned. The parsed tree is not modified,
+    so the same soup can be shared with other readers.
+    """
+    cache = {}
+    root = soup.body or soup
+    scores = {}
+    candidates = {}
+
+    for paragraph in root.find_all(["p", "pre"]):
+        if _inside_boilerplate(paragraph, root, cache):
+            continue
+
+        text = paragraph.get_text(strip=True)
+        if len(text) < 25:
+            continue
+
+        score = 1 + text.count(",") + min(len(text) // 100, 3)
+        for depth, ancestor in enumerate([paragraph.parent, paragraph.parent.parent if paragraph.parent else None]):
+            if not isinstance(ancestor, Tag):
+                continue
+            if id(ancestor) not in scores:
+                candidates[id(ancestor)] = ancestor
+                scores[id(ancestor)] = _class_weight(ancestor) + (5 if ancestor.name in ("article", "main") else 0)
+            scores[id(ancestor)] += score if depth == 0 else score / 2
+
+    if not scores:
+        return _visible_text(root, cache)
+
+    final_scores = {key: score * (1 - _link_density(candidates[key])) for key, score in scores.items()}
+    best_key = max(final_scores, key=final_scores.get)
+    best = candidates[best_key]
+
+    # Siblings that look like more of the same article (split bodies, paragraphs next to the container)
+    threshold = max(10.0, final_scores[best_key] * 0.2)
+    parts = []
+    siblings = best.parent.children if best.parent is not None else [best]
+    for sibling in siblings:
+        if not isinstance(sibling, Tag) or (sibling is not best and _is_boilerplate(sibling, cache)):
+            continue
+
+        if sibling is best or final_scores.get(id(sibling), 0) >= threshold:
+            parts.append(_block_text(sibling, cache))
+        elif sibling.name == "p":
+            text = " ".join(sibling.get_text().split())
+            if len(text) > 80 and _link_density(sibling) < 0.25:
+                parts.append(text)
+
+    main_text = "\n".join(part for part in parts if part)
+    if len(main_text) < MIN_ARTICLE_CHARS:
+        return _visible_text(root, cache)
+
+    return main_text
@@ -0,0 +1,113 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from config import get_env_int
+
+# Directory for every persistent cache (articles, summaries, ...)
+CACHE_DIR = os.getenv("CACHE_DIR", "cache")
+
+
+class DiskCache:
+    """
+    Persistent key/value store in SQLite. Values are zlib compressed, each entry keeps a small
+    JSON metadata dict, and the total stored size is capped by evicting least recently used entries.
+    Cache failures are logged and treated as misses, they never break the caller.
+    """
+
+    def __init__(self, name, max_bytes):
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        self.path = os.path.join(CACHE_DIR, f"{name}.sqlite3")
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+
+        self.connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                meta TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self.connection.execute("CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at)")
+
+    def get(self, key):
+        """ Return (value bytes, meta dict, stored_at) or None """
+        try:
+            with self.lock:
+                row = self.connection.execute(
+                    "SELECT value, meta, stored_at FROM entries WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    return None
+
+                self.connection.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (time.time(), key))
+
+            return zlib.decompress(row[0]), json.loads(row[1]), row[2]
+        except (sqlite3.Error, zlib.error, ValueError) as e:
+            print(f"Cache read failed for {self.path}: {e}")
+            return None
+
+    def set(self, key, value, meta=None):
+        """ Store value (bytes) under key and evict old entries if the cache is over its size cap """
+        compressed = zlib.compress(value)
+        now = time.time()
+
+        try:
+            with self.lock:
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO entries (key, value, meta, size, stored_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, compressed, json.dumps(meta or {}), len(compressed), now, now))
+                self._evict()
+        except sqlite3.Error as e:
+            print(f"Cache write failed for {self.path}: {e}")
+
+    def touch(self, key, meta=None):
+        """ Mark an entry as fresh again (e.g. after a 304 Not Modified), optionally replacing its metadata """
+        now = time.time()
+
+        try:
+            with self.lock:
+                if meta is None:
+                    self.connection.execute("UPDATE entries SET stored_at = ?, accessed_at = ? WHERE key = ?",
+                                            (now, now, key))
+                else:
+                    self.connection.execute(
+                        "UPDATE entries SET stored_at = ?, accessed_at = ?, meta = ? WHERE key = ?",
+                        (now, now, json.dumps(meta), key))
+        except sqlite3.Error as e:
+            print(f"Cache update failed for {self.path}: {e}")
+
+    def _evict(self):
+        total = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        # Walk from least recently used and delete until the cache fits again
+        stale_keys = []
+        for key, size in self.connection.execute("SELECT key, size FROM entries ORDER BY accessed_at").fetchall():
+            if total <= self.max_bytes:
+                break
+            stale_keys.append((key,))
+            total -= size
+
+        self.connection.executemany("DELETE FROM entries WHERE key = ?", stale_keys)
+
+
+def create_disk_cache(name, max_bytes_env, default_max_bytes):
+    """ DiskCache sized from an environment variable, or None when the variable is 0 (cache disabled) """
+    max_bytes = get_env_int(max_bytes_env, default_max_bytes)
+    if max_bytes <= 0:
+        return None
+
+    try:
+        return DiskCache(name, max_bytes)
+    except sqlite3.Error as e:
+        print(f"Failed to open {name} cache, continuing without it: {e}")
+        return None
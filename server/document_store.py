@@ -0,0 +1,85 @@
+import asyncio
+import threading
+import http_client
+from bs4 import BeautifulSoup
+from config import get_env_float
+from disk_cache import create_disk_cache
+
+# Persistent article cache shared across requests (ARTICLE_CACHE_MAX_BYTES=0 disables it)
+article_cache = create_disk_cache("articles", "ARTICLE_CACHE_MAX_BYTES", 256 * 1024 * 1024)
+
+# Cached articles younger than this are served without contacting the publisher, older ones are revalidated
+ARTICLE_CACHE_MAX_AGE_SECS = get_env_float("ARTICLE_CACHE_MAX_AGE_SECS", 1800.0)
+
+
+class Document:
+    """ A downloaded page: the first response body and its parsed tree (parsed lazily, at most once) """
+
+    def __init__(self, url, status_code, html):
+        self.url = url
+        self.status_code = status_code
+        self.html = html
+        self._soup = None
+        self._lock = threading.Lock()
+
+    @property
+    def soup(self):
+        with self._lock:
+            if self._soup is None:
+                self._soup = BeautifulSoup(self.html, "html.parser")
+            return self._soup
+
+
+class DocumentStore:
+    """
+    Per-request cache of downloaded pages, so the static page check and the article
+    extraction read the same response instead of downloading and parsing it twice.
+    """
+
+    def __init__(self):
+        self.documents = {}
+        self.url_locks = {}
+        self.downloads = {}  # url -> asyncio task, for get_async callers
+        self.lock = threading.Lock()
+
+    def _url_lock(self, url):
+        with self.lock:
+            return self.url_locks.setdefault(url, threading.Lock())
+
+    def get(self, url, timeout=None):
+        """ Return the Document for url, downloading it only on first use. Raises requests exceptions. """
+        document = self.documents.get(url)
+        if document is not None:
+            return document
+
+        # Concurrent callers for the same url wait for a single download
+        with self._url_lock(url):
+            document = self.documents.get(url)
+            if document is None:
+                response = http_client.cached_get(url, article_cache, ARTICLE_CACHE_MAX_AGE_SECS, timeout=timeout)
+                document = Document(url, response.status_code, response.text)
+                self.documents[url] = document
+
+        return document
+
+    async def get_async(self, url, timeout=None):
+        """ Non-blocking get() for coroutines on the async_runtime loop; concurrent callers share one download """
+        document = self.documents.get(url)
+        if document is not None:
+            return document
+
+        download = self.downloads.get(url)
+        if download is None:
+            download = asyncio.ensure_future(self._download_async(url, timeout))
+            self.downloads[url] = download
+
+        try:
+            # A cancelled caller must not cancel the download other callers are waiting for
+            return await asyncio.shield(download)
+        finally:
+            if download.done() and self.downloads.get(url) is download:
+                del self.downloads[url]
+
+    async def _download_async(self, url, timeout):
+        response = await http_client.cached_get_async(url, article_cache, ARTICLE_CACHE_MAX_AGE_SECS, timeout=timeout)
+        return self.documents.setdefault(url, Document(url, response.status_code, response.text))
@@ -0,0 +1,69 @@
+import math
+import re
+from collections import Counter
+
+# Sentence ends, plus line breaks between extracted blocks (headings, bylines)
+SENTENCE_END = re.compile(r'(?<=[.!?])\s+|\n+')
+WORD = re.compile(r"[a-z0-9]+")
+TOKEN = re.compile(r"\w+|[^\w\s]")
+
+STOP_WORDS = {
+    "a", "an", "the", "and", "or", "but", "if", "of", "to", "in", "on", "at", "by", "for", "with", "from", "as",
+    "is", "are", "was", "were", "be", "been", "being", "it", "its", "this", "that", "these", "those", "he", "she",
+    "they", "them", "his", "her", "their", "we", "our", "you", "your", "i", "not", "no", "so", "than", "then",
+    "there", "which", "who", "whom", "what", "when", "where", "how", "will", "would", "can", "could", "has", "have",
+    "had", "do", "does", "did", "said", "says", "also", "about", "into", "over", "after", "more", "most", "some",
+    "such", "up", "out", "one", "all", "any", "just", "s"
+}
+
+
+def estimate_tokens(text):
+    """ Cheap model token estimate: words and punctuation marks (BPE splits rare words a bit further) """
+    return len(TOKEN.findall(text))
+
+
+def select_salient_sentences(text, max_tokens, max_sentences=None):
+    """
+    TF-IDF centroid ranking: every sentence is scored by cosine similarity between its TF-IDF
+    vector and the centroid of the whole article, with a small bonus for lead sentences.
+    The best sentences are kept, in their original order, until max_tokens (estimated) is reached.
+    Text that already fits the budget is returned unchanged.
+    """
+    sentences = [sentence.strip() for sentence in SENTENCE_END.split(text) if sentence.strip()]
+    lengths = [estimate_tokens(sentence) for sentence in sentences]
+
+    if sum(lengths) <= max_tokens and (max_sentences is None or len(sentences) <= max_sentences):
+        return text
+
+    bags = [Counter(word for word in WORD.findall(sentence.lower()) if word not in STOP_WORDS)
+            for sentence in sentences]
+
+    document_frequency = Counter()
+    for bag in bags:
+        document_frequency.update(bag.keys())
+    idf = {word: math.log(len(sentences) / count) + 1 for word, count in document_frequency.items()}
+
+    vectors = [{word: count * idf[word] for word, count in bag.items()} for bag in bags]
+    centroid = Counter()
+    for vector in vectors:
+        centroid.update(vector)
+    centroid_norm = math.sqrt(sum(value * value for value in centroid.values())) or 1.0
+
+    scores = []
+    for position, vector in enumerate(vectors):
+        norm = math.sqrt(sum(value * value for value in vector.values()))
+        similarity = sum(value * centroid[word] for word, value in vector.items()) / (norm * centroid_norm) \
+            if norm else 0.0
+        # News articles front-load the important facts
+        scores.append(similarity * (1 + 0.5 / (1 + position)))
+
+    selected, used_tokens = [], 0
+    for index in sorted(range(len(sentences)), key=lambda position: scores[position], reverse=True):
+        if max_sentences is not None and len(selected) >= max_sentences:
+            break
+        if used_tokens + lengths[index] > max_tokens:
+            continue
+        selected.append(index)
+        used_tokens += lengths[index]
+
+    return " ".join(sentences[index] for index in sorted(selected))
@@ -0,0 +1,90 @@
+import asyncio
+import os
+import random
+import threading
+from google import genai
+from google.genai import errors, types
+from async_runtime import run_coroutine
+from config import get_env_int, get_env_float
+from rate_limiter import TokenBucket
+
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.0-flash")
+
+# Quota of the API key; requests wait for both buckets instead of running into 429 responses
+GEMINI_RPM = get_env_int("GEMINI_RPM", 15)
+GEMINI_TPM = get_env_int("GEMINI_TPM", 1000000)
+
+# Retries of 429 / 5xx responses, with exponential backoff and full jitter
+GEMINI_MAX_RETRIES = get_env_int("GEMINI_MAX_RETRIES", 4)
+GEMINI_RETRY_BASE_SECS = get_env_float("GEMINI_RETRY_BASE_SECS", 1.0)
+GEMINI_RETRY_MAX_SECS = get_env_float("GEMINI_RETRY_MAX_SECS", 30.0)
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+request_limiter = TokenBucket(GEMINI_RPM / 60, capacity=max(1, GEMINI_RPM // 4))
+token_limiter = TokenBucket(GEMINI_TPM / 60, capacity=max(1, GEMINI_TPM // 4))
+
+client = None
+client_lock = threading.Lock()
+
+
+class GeminiUnavailableError(Exception):
+    pass
+
+
+def get_client():
+    """ One genai.Client for the process, created on first use; None when GEMINI_AI_API_KEY is not set """
+    global client
+
+    with client_lock:
+        if client is None:
+            api_key = os.getenv("GEMINI_AI_API_KEY")
+            if api_key is None:
+                return None
+
+            # GEMINI_BASE_URL points the client at another endpoint, e.g. benchmarks/fake_gemini_server.py
+            base_url = os.getenv("GEMINI_BASE_URL")
+            http_options = types.HttpOptions(base_url=base_url) if base_url else None
+            client = genai.Client(api_key=api_key, http_options=http_options)
+        return client
+
+
+def is_available():
+    return get_client() is not None
+
+
+def estimate_prompt_tokens(prompt):
+    # About four characters per token for English text
+    return max(1, len(prompt) // 4)
+
+
+async def generate_async(prompt, json_output=False):
+    """
+    Response text of one generate_content call, rate limited and retried. Runs on the async_runtime loop.
+    json_output=True asks the model for a JSON response (response_mime_type application/json).
+    """
+    gemini = get_client()
+    if gemini is None:
+        raise GeminiUnavailableError("Gemini model is unavailable.")
+
+    config = types.GenerateContentConfig(response_mime_type="application/json") if json_output else None
+
+    tokens = estimate_prompt_tokens(prompt)
+    for attempt in range(GEMINI_MAX_RETRIES + 1):
+        await asyncio.sleep(max(request_limiter.reserve(), token_limiter.reserve(tokens)))
+
+        try:
+            response = await gemini.aio.models.generate_content(model=GEMINI_MODEL, contents=prompt, config=config)
+            return response.text
+        except errors.APIError as e:
+            if e.code not in RETRY_STATUS_CODES or attempt == GEMINI_MAX_RETRIES:
+                raise
+
+            delay = random.uniform(0, min(GEMINI_RETRY_MAX_SECS, GEMINI_RETRY_BASE_SECS * 2 ** attempt))
+            print(f"Warning: Gemini returned {e.code}, retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+
+def generate(prompt, json_output=False):
+    """ Synchronous generate_async """
+    return run_coroutine(generate_async(prompt, json_output=json_output))
@@ -0,0 +1,145 @@
+import asyncio
+import threading
+import time
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from config import get_env_int, get_env_float
+
+# Keep-alive connections kept per host, and hosts whose pools are kept around
+HTTP_POOL_MAXSIZE = get_env_int("HTTP_POOL_MAXSIZE", 4)
+HTTP_POOL_HOSTS = get_env_int("HTTP_POOL_HOSTS", 32)
+
+# Upper bound on requests in flight across all hosts
+HTTP_MAX_CONNECTIONS = get_env_int("HTTP_MAX_CONNECTIONS", 16)
+
+HTTP_CONNECT_TIMEOUT_SECS = get_env_float("HTTP_CONNECT_TIMEOUT_SECS", 5.0)
+HTTP_READ_TIMEOUT_SECS = get_env_float("HTTP_READ_TIMEOUT_SECS", 15.0)
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0",
+    # Brotli responses are decoded by urllib3 when the Brotli package is installed
+    "Accept-Encoding": "gzip, deflate, br",
+}
+
+connection_slots = threading.BoundedSemaphore(HTTP_MAX_CONNECTIONS)
+
+
+def create_session():
+    """ Session with per-host connection pooling and a small retry budget for connection errors """
+    new_session = requests.Session()
+    new_session.headers.update(DEFAULT_HEADERS)
+
+    retries = Retry(total=2, connect=2, read=1, status=0, backoff_factor=0.5, allowed_methods=["GET", "HEAD"])
+    adapter = HTTPAdapter(pool_connections=HTTP_POOL_HOSTS, pool_maxsize=HTTP_POOL_MAXSIZE, pool_block=True,
+                          max_retries=retries)
+    new_session.mount("http://", adapter)
+    new_session.mount("https://", adapter)
+
+    return new_session
+
+
+session = create_session()
+
+# Async counterpart of session, see get_async_client
+async_client = None
+
+
+def get(url, headers=None, timeout=None, **kwargs):
+    """ GET through the shared session. Raises requests exceptions like requests.get. """
+    if timeout is None:
+        timeout = (HTTP_CONNECT_TIMEOUT_SECS, HTTP_READ_TIMEOUT_SECS)
+
+    with connection_slots:
+        return session.get(url, headers=headers, timeout=timeout, **kwargs)
+
+
+class CachedResponse:
+    """ The parts of a response the scrapers use, whether it came from the network or the article cache """
+
+    def __init__(self, status_code, text, from_cache=False):
+        self.status_code = status_code
+        self.text = text
+        self.from_cache = from_cache
+
+
+def _cache_lookup(url, cache, max_age_secs):
+    """ Returns (fresh cached response or None, cache entry, conditional request headers) """
+    entry = cache.get(url) if cache is not None else None
+    if entry is None:
+        return None, None, None
+
+    body, meta, stored_at = entry
+    if time.time() - stored_at < max_age_secs:
+        return CachedResponse(200, body.decode("utf-8"), from_cache=True), entry, None
+
+    headers = {}
+    if meta.get("etag"):
+        headers["If-None-Match"] = meta["etag"]
+    if meta.get("last_modified"):
+        headers["If-Modified-Since"] = meta["last_modified"]
+    return None, entry, headers
+
+
+def _cache_response(url, cache, entry, status_code, text, response_headers):
+    if status_code == 304 and entry is not None:
+        cache.touch(url)
+        return CachedResponse(200, entry[0].decode("utf-8"), from_cache=True)
+
+    cache_control = response_headers.get("Cache-Control", "").lower()
+    if cache is not None and status_code == 200 and "no-store" not in cache_control:
+        meta = {"etag": response_headers.get("ETag"), "last_modified": response_headers.get("Last-Modified")}
+        cache.set(url, text.encode("utf-8"), meta)
+
+    return CachedResponse(status_code, text)
+
+
+def cached_get(url, cache, max_age_secs, timeout=None):
+    """
+    GET with a persistent cache: entries younger than max_age_secs are served without a request,
+    older ones are revalidated with a conditional GET (ETag / Last-Modified).
+    """
+    cached_response, entry, headers = _cache_lookup(url, cache, max_age_secs)
+    if cached_response is not None:
+        return cached_response
+
+    response = get(url, headers=headers, timeout=timeout)
+    return _cache_response(url, cache, entry, response.status_code, response.text, response.headers)
+
+
+def get_async_client():
+    """ Shared httpx.AsyncClient, created on first use. Only use it from the async_runtime loop. """
+    global async_client
+
+    if async_client is None:
+        async_client = httpx.AsyncClient(
+            headers=DEFAULT_HEADERS,
+            follow_redirects=True,
+            timeout=httpx.Timeout(HTTP_READ_TIMEOUT_SECS, connect=HTTP_CONNECT_TIMEOUT_SECS),
+            # The client ignores limits= once a transport is given, so the pool limits go to the transport
+            transport=httpx.AsyncHTTPTransport(
+                retries=2,
+                limits=httpx.Limits(max_connections=HTTP_MAX_CONNECTIONS,
+                                    max_keepalive_connections=HTTP_POOL_HOSTS * HTTP_POOL_MAXSIZE)
+            )
+        )
+    return async_client
+
+
+async def async_get(url, headers=None, timeout=None):
+    """ Non-blocking GET through the shared async client. Raises httpx exceptions. """
+    if timeout is None:
+        return await get_async_client().get(url, headers=headers)
+    return await get_async_client().get(url, headers=headers, timeout=timeout)
+
+
+async def cached_get_async(url, cache, max_age_secs, timeout=None):
+    """ cached_get for coroutines on the async_runtime loop. Cache I/O (SQLite, zlib) runs in a worker thread. """
+    cached_response, entry, headers = await asyncio.to_thread(_cache_lookup, url, cache, max_age_secs)
+    if cached_response is not None:
+        return cached_response
+
+    response = await async_get(url, headers=headers, timeout=timeout)
+    return await asyncio.to_thread(_cache_response, url, cache, entry, response.status_code, response.text,
+                                   response.headers)
@@ -0,0 +1,173 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from config import get_env_bool, get_env_int
+from disk_cache import create_disk_cache
+from summarizer import all_articles_summary_with_gemini, all_articles_comparative_analysis_with_gemini
+from text_to_speech import FAILED_AUDIO_FILES, generate_audio
+from utils import markdown_to_plain_text
+
+# Markdown of generated insights; the narration audio is content-addressed by text_to_speech
+insights_cache = create_disk_cache("insights", "INSIGHTS_CACHE_MAX_BYTES", 16 * 1024 * 1024)
+INSIGHTS_MEMORY_ENTRIES = 256
+
+insights_memory = OrderedDict()  # key -> {"Markdown", "Audio"}
+insights_in_flight = {}  # key -> Future, so concurrent identical requests call Gemini once
+insights_lock = threading.Lock()
+
+# Opt-in: start both analyses (and their audio) as soon as a search finishes, so the buttons find them ready
+PREFETCH_INSIGHTS = get_env_bool("PREFETCH_INSIGHTS")
+prefetch_executor = ThreadPoolExecutor(max_workers=max(1, get_env_int("PREFETCH_WORKERS", 2)),
+                                       thread_name_prefix="insights-prefetch")
+prefetches = {}  # session id -> {"Cancelled": Event, "Futures": [Future]}
+prefetch_lock = threading.Lock()
+
+
+def article_pairs(articles):
+    """ (title, summary) of API ({"title", "summary"}) and UI ({"Title", "Summary"}) articles alike """
+    return [(str(article.get("Title", article.get("title", ""))).strip(),
+             str(article.get("Summary", article.get("summary", ""))).strip())
+            for article in articles]
+
+
+def insights_key(articles, analysis_type):
+    """ Canonical hash of the ordered (title, summary) list and the analysis type ("overview" / "analysis") """
+    payload = json.dumps([analysis_type, article_pairs(articles)], ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def build_insights(articles, analysis_type):
+    """ Ask Gemini for the overview or the comparative analysis; returns (status, markdown or error) """
+    pairs = article_pairs(articles)
+
+    if analysis_type == "overview":
+        joined_summary = "\n".join(f"{title} - {summary}" for title, summary in pairs)
+        return all_articles_summary_with_gemini(joined_summary)
+
+    joined_summary = "\n".join(f"Article-{i + 1}: **{title}** - {summary}" for i, (title, summary) in enumerate(pairs))
+    return all_articles_comparative_analysis_with_gemini(joined_summary)
+
+
+def _remember(key, insights):
+    with insights_lock:
+        insights_memory[key] = insights
+        insights_memory.move_to_end(key)
+        while len(insights_memory) > INSIGHTS_MEMORY_ENTRIES:
+            insights_memory.popitem(last=False)
+
+
+def _cached_insights(key):
+    with insights_lock:
+        insights = insights_memory.get(key)
+        if insights is not None:
+            insights_memory.move_to_end(key)
+            return dict(insights)
+
+    if insights_cache is not None:
+        entry = insights_cache.get(key)
+        if entry is not None:
+            insights = {"Markdown": entry[0].decode("utf-8"), "Audio": entry[1].get("audio")}
+            _remember(key, insights)
+            return dict(insights)
+
+    return None
+
+
+def _store_insights(key, insights):
+    _remember(key, insights)
+    if insights_cache is not None:
+        insights_cache.set(key, insights["Markdown"].encode("utf-8"), {"audio": insights["Audio"]})
+
+
+def get_insights(articles, analysis_type, with_audio=False):
+    """
+    Overview or comparative analysis of articles, memoized by insights_key. Returns (True, {"Markdown", "Audio"})
+    or (False, error). Audio is the narration file when with_audio is set (generated once, then reused).
+    Failures are not cached.
+    """
+    key = insights_key(articles, analysis_type)
+
+    insights = _cached_insights(key)
+    if insights is None:
+        with insights_lock:
+            future = insights_in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = insights_in_flight[key] = Future()
+
+        if owner:
+            try:
+                status, markdown = build_insights(articles, analysis_type)
+                future.set_result((status, markdown))
+            except Exception as e:
+                future.set_exception(e)
+                raise
+            finally:
+                with insights_lock:
+                    insights_in_flight.pop(key, None)
+        else:
+            status, markdown = future.result()
+
+        if not status:
+            return False, markdown
+
+        insights = {"Markdown": markdown, "Audio": None}
+        if owner:
+            _store_insights(key, insights)
+
+    if with_audio and (insights["Audio"] is None or not os.path.isfile(insights["Audio"])):
+        # Content-addressed, so this is a file lookup unless the audio was never generated or was evicted
+        insights["Audio"] = generate_audio(markdown_to_plain_text(insights["Markdown"]))
+        if insights["Audio"] not in FAILED_AUDIO_FILES:
+            _store_insights(key, insights)
+
+    return True, insights
+
+
+def _prefetch(articles, analysis_type, cancelled):
+    if cancelled.is_set():
+        return
+
+    # Markdown first: a Gemini call already sent is not abandoned (its result is cached), but audio is skipped
+    status, _ = get_insights(articles, analysis_type)
+    if status and not cancelled.is_set():
+        get_insights(articles, analysis_type, with_audio=True)
+
+
+def _run_prefetch(articles, analysis_type, cancelled):
+    try:
+        _prefetch(articles, analysis_type, cancelled)
+    except Exception as e:
+        print(f"Warning: Prefetching {analysis_type} failed: {e}")
+
+
+def prefetch_insights(session_id, articles):
+    """
+    Start the overview and comparative analysis of articles in the background, replacing the session's previous
+    prefetch. get_insights calls made meanwhile attach to the in-flight work. No-op unless PREFETCH_INSIGHTS is set.
+    """
+    if not PREFETCH_INSIGHTS or not articles:
+        return
+
+    cancel_prefetch(session_id)
+
+    cancelled = threading.Event()
+    futures = [prefetch_executor.submit(_run_prefetch, articles, analysis_type, cancelled)
+               for analysis_type in ("overview", "analysis")]
+
+    with prefetch_lock:
+        prefetches[session_id] = {"Cancelled": cancelled, "Futures": futures}
+
+
+def cancel_prefetch(session_id):
+    """ Drop the session's queued prefetch work and skip the audio of the work already running """
+    with prefetch_lock:
+        prefetch = prefetches.pop(session_id, None)
+
+    if prefetch is not None:
+        prefetch["Cancelled"].set()
+        for future in prefetch["Futures"]:
+            future.cancel()
@@ -0,0 +1,117 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from config import get_env_int
+
+# Jobs running at the same time, and how many more may wait for a free worker before new ones are refused
+JOB_WORKERS = get_env_int("JOB_WORKERS", 2)
+JOB_QUEUE_DEPTH = get_env_int("JOB_QUEUE_DEPTH", 8)
+
+# Finished jobs (and their results) are forgotten after this many seconds
+JOB_RESULT_TTL_SECS = get_env_int("JOB_RESULT_TTL_SECS", 3600)
+
+
+class QueueFullError(Exception):
+    pass
+
+
+class Job:
+    """ State of one background job. The job function reports progress through update(). """
+
+    def __init__(self, kind):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.status = "queued"
+        self.stage = "queued"
+        self.articles_done = 0
+        self.articles_total = None
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self.lock = threading.Lock()
+
+    def update(self, **fields):
+        with self.lock:
+            for name, value in fields.items():
+                setattr(self, name, value)
+
+    def to_dict(self):
+        with self.lock:
+            data = {
+                "JobId": self.id,
+                "Kind": self.kind,
+                "Status": self.status,
+                "Stage": self.stage,
+                "Progress": {"ArticlesDone": self.articles_done, "ArticlesTotal": self.articles_total},
+                "CreatedAt": self.created_at,
+                "FinishedAt": self.finished_at
+            }
+            if self.status == "done":
+                data["Result"] = self.result
+            if self.status == "failed":
+                data["error"] = self.error
+            return data
+
+
+class JobManager:
+    """
+    In-process job queue: a fixed pool of worker threads plus at most max_queued waiting jobs.
+    submit() raises QueueFullError instead of queueing without bound, so callers can push back (HTTP 429).
+    """
+
+    def __init__(self, max_workers=JOB_WORKERS, max_queued=JOB_QUEUE_DEPTH, result_ttl_secs=JOB_RESULT_TTL_SECS):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self.slots = threading.BoundedSemaphore(max_workers + max_queued)
+        self.result_ttl_secs = result_ttl_secs
+        self.jobs = {}
+        self.lock = threading.Lock()
+
+    def submit(self, kind, function, *args):
+        """ Queue function(job, *args); its return value becomes the job result """
+        self._purge_expired()
+
+        if not self.slots.acquire(blocking=False):
+            raise QueueFullError("Too many jobs are queued, please retry later.")
+
+        job = Job(kind)
+        with self.lock:
+            self.jobs[job.id] = job
+
+        try:
+            self.executor.submit(self._run, job, function, args)
+        except Exception:
+            self.slots.release()
+            with self.lock:
+                self.jobs.pop(job.id, None)
+            raise
+
+        return job
+
+    def get(self, job_id):
+        self._purge_expired()
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def _run(self, job, function, args):
+        try:
+            job.update(status="running", stage="running")
+            result = function(job, *args)
+            job.update(status="done", stage="done", result=result, finished_at=time.time())
+        except Exception as e:
+            print(f"Error: Job {job.id} ({job.kind}) failed due to {e}")
+            job.update(status="failed", stage="failed", error=str(e), finished_at=time.time())
+        finally:
+            self.slots.release()
+
+    def _purge_expired(self):
+        expires_before = time.time() - self.result_ttl_secs
+        with self.lock:
+            expired = [job_id for job_id, job in self.jobs.items()
+                       if job.finished_at is not None and job.finished_at < expires_before]
+            for job_id in expired:
+                del self.jobs[job_id]
+
+
+job_manager = JobManager()
@@ -1,18 +1,32 @@
 import requests
 from bs4 import BeautifulSoup
-import time
-from summarizer import summarize_article_content
+import http_client
+import asyncio
+from concurrent.futures import wait, FIRST_COMPLETED
+from async_runtime import submit_coroutine
+from summarizer import fetch_article_html, summarize_articles_text
+from rate_limiter import DomainRateLimiter
+from translation import translate_texts
+from document_store import DocumentStore
+from config import get_env_int, get_env_float
+
+# Number of article downloads in flight while earlier articles are being summarized
+SCRAPER_MAX_WORKERS = get_env_int("SCRAPER_MAX_WORKERS", 6)
+
+# Minimum gap between two requests to the same publisher (replaces the global sleep between articles)
+SCRAPER_DOMAIN_INTERVAL_SECS = get_env_float("SCRAPER_DOMAIN_INTERVAL_SECS", 1.0)
+
+domain_rate_limiter = DomainRateLimiter(min_interval_secs=SCRAPER_DOMAIN_INTERVAL_SECS)
 
 
 def get_google_news_links(company_name, max_articles=10, skip=0):
     start = skip
-    headers = {"User-Agent": "Mozilla/5.0"}
 
     links = []
 
     while len(links) < max_articles:
         search_url = f'https://www.google.com/search?q=company:"{company_name}"+news&tbm=nws&start={start}'
-        response = requests.get(search_url, headers=headers)
+        response = http_client.get(search_url)
 
         if response.status_code != 200:
             print(f"Error fetching data: {response.status_code}")
@@ -42,49 +56,117 @@ def get_google_news_links(company_name, max_articles=10, skip=0):
     return links[:max_articles]
 
 
-def is_static_page(url):
+def is_static_document(document):
+    # Heuristic: If body is empty or has JS-based prompts, it's likely JavaScript-based
+    body_text = document.soup.get_text(strip=True)
+    if "enable JavaScript" in body_text or len(body_text) < 500:
+        return False
+    return True
+
+
+def is_static_page(url, document_store=None):
     """ Check if a webpage is static (not requiring JavaScript) """
-    headers = {"User-Agent": "Mozilla/5.0"}
-    try:
-        response = requests.get(url, headers=headers, timeout=5)
-        soup = BeautifulSoup(response.text, "html.parser")
+    if document_store is None:
+        document_store = DocumentStore()
 
-        # Heuristic: If body is empty or has JS-based prompts, it's likely JavaScript-based
-        body_text = soup.get_text(strip=True)
-        if "enable JavaScript" in body_text or len(body_text) < 500:
-            return False
-        return True
+    try:
+        return is_static_document(document_store.get(url))
     except requests.exceptions.RequestException:
         return False
 
 
-def extract_news_content(url, use_gemini=False):
-    final_summary = summarize_article_content(url, use_gemini=use_gemini)
+async def download_article(url, document_store, download_slots):
+    """
+    Download stage, a coroutine on the async_runtime loop: keep only static pages and fetch their title and text,
+    rate limited per domain. At most SCRAPER_MAX_WORKERS downloads are in flight (download_slots).
+    """
+    try:
+        await asyncio.sleep(domain_rate_limiter.reserve(url))
 
-    return {"Title": final_summary['Title'], "Summary": final_summary['Summary'], "URL": url}
+        async with download_slots:
+            document = await document_store.get_async(url)
 
+        # Both checks read the same downloaded document from the store
+        if document.status_code != 200 or not await asyncio.to_thread(is_static_document, document):
+            return None
 
-def get_news_articles(company_name, max_articles=10, skip=0, use_gemini=False):
+        # Titles are translated per summarization group, in one batch (extract_news_contents)
+        article_title, article_text = await fetch_article_html(url, document_store, translate_title=False)
+        if article_title is None:
+            return None
+
+        return article_title, article_text
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        print(f"Failed to download article {url}: {e}")
+        return None
+
+
+def extract_news_contents(downloaded_articles, use_gemini=False):
+    """ Summarization stage for a group of downloaded articles, given as (url, title, text) """
+    titles = translate_texts([article_title for _, article_title, _ in downloaded_articles], dest='en')
+
+    final_summaries = summarize_articles_text([(title, article_text)
+                                               for title, (_, _, article_text) in zip(titles, downloaded_articles)],
+                                              use_gemini=use_gemini)
+
+    return [{"Title": final_summary['Title'], "Summary": final_summary['Summary'], "URL": url}
+            for (url, _, _), final_summary in zip(downloaded_articles, final_summaries)]
+
+
+def iter_news_articles(company_name, max_articles=10, skip=0, use_gemini=False):
+    """
+    Yield (index, article) as soon as each article is summarized; index is the article's position
+    in the search results. Closing the generator early cancels the remaining downloads.
+    """
     all_links = get_google_news_links(company_name, max_articles=max_articles * 2, skip=skip)
-    static_links = [link for link in all_links if is_static_page(link)]
 
-    if len(static_links) == 0:
-        return []
+    if len(all_links) == 0:
+        return
+
+    # Downloads run concurrently on the async runtime loop, summarization consumes them in groups as they finish
+    document_store = DocumentStore()
+    download_slots = asyncio.Semaphore(SCRAPER_MAX_WORKERS)
+    futures = {submit_coroutine(download_article(url, document_store, download_slots)): (index, url)
+               for index, url in enumerate(all_links)}
 
-    news_data = []
     scrapped_articles = 0
+    pending = set(futures)
 
-    for url in static_links:
-        if scrapped_articles >= max_articles:
-            return news_data
+    try:
+        while pending and scrapped_articles < max_articles:
+            # Every download finished while the previous group was summarized joins the next batch
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+            downloaded = []
+            for future in sorted(done, key=lambda item: futures[item][0]):
+                result = future.result()
+                if result is not None:
+                    index, url = futures[future]
+                    downloaded.append((index, url, result))
+
+            downloaded = downloaded[:max_articles - scrapped_articles]
+            if len(downloaded) == 0:
+                continue
+
+            articles = extract_news_contents([(url, *result) for _, url, result in downloaded], use_gemini=use_gemini)
+            for (index, _, _), article in zip(downloaded, articles):
+                if article['Title'] is not None:
+                    scrapped_articles += 1
+                    yield index, article
+    finally:
+        # Enough articles, an error or the consumer went away: cancel queued and in-flight downloads
+        for future in futures:
+            future.cancel()
 
-        article = extract_news_content(url, use_gemini=use_gemini)
-        if article['Title'] is not None:
-            news_data.append(article)
-            scrapped_articles += 1
-        time.sleep(1)
 
-    return news_data
+def get_news_articles(company_name, max_articles=10, skip=0, use_gemini=False):
+    news_data = list(iter_news_articles(company_name, max_articles=max_articles, skip=skip, use_gemini=use_gemini))
+
+    # Keep the search result order, independent of which download finished first
+    news_data.sort(key=lambda item: item[0])
+    return [article for _, article in news_data]
 
 
 def fetch_news(company, max_articles=10, skip=0, use_gemini=False):
@@ -0,0 +1,135 @@
+import gc
+import os
+import threading
+import time
+from contextlib import contextmanager
+from disk_cache import CACHE_DIR
+
+
+def load_torch_model(model_name):
+    """ Reference fp32 PyTorch model """
+    from transformers import AutoModelForSeq2SeqLM
+
+    model = AutoModelForSeq2SeqLM.from_pretrained(model_name)
+    model.eval()
+    return model
+
+
+def load_int8_model(model_name):
+    """ fp32 model with its Linear layers dynamically quantized to int8 """
+    import torch
+
+    return torch.ao.quantization.quantize_dynamic(load_torch_model(model_name), {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def load_onnx_model(model_name):
+    """ ONNX Runtime graph, exported once and kept under CACHE_DIR. Needs `pip install optimum[onnxruntime]`. """
+    try:
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    except ImportError as e:
+        raise RuntimeError("SUMMARIZER_BACKEND=onnx needs the optimum[onnxruntime] package") from e
+
+    export_dir = os.path.join(CACHE_DIR, "onnx", model_name.replace("/", "--"))
+    if os.path.isdir(export_dir):
+        return ORTModelForSeq2SeqLM.from_pretrained(export_dir)
+
+    model = ORTModelForSeq2SeqLM.from_pretrained(model_name, export=True)
+    model.save_pretrained(export_dir)
+    return model
+
+
+# Values of SUMMARIZER_BACKEND; every backend exposes the same generate() API
+BACKENDS = {
+    "torch": load_torch_model,
+    "int8": load_int8_model,
+    "onnx": load_onnx_model
+}
+
+
+class LazyModel:
+    """
+    Hugging Face seq2seq tokenizer/model pair loaded on first use instead of at import time.
+    Loading is thread-safe and happens once; with idle_unload_secs > 0 a background thread
+    frees the model weights after that many seconds without use (the tokenizer is kept, it is small).
+    """
+
+    def __init__(self, model_name, backend="torch", idle_unload_secs=0.0):
+        if backend not in BACKENDS:
+            print(f"Warning: Unknown summarizer backend {backend}. Using torch.")
+            backend = "torch"
+
+        self.model_name = model_name
+        self.backend = backend
+        self.idle_unload_secs = idle_unload_secs
+        self.tokenizer = None
+        self.model = None
+        self.active_users = 0
+        self.last_used_at = time.monotonic()
+        self.lock = threading.Lock()
+        self.janitor = None
+
+    def get_tokenizer(self):
+        if self.tokenizer is None:
+            with self.lock:
+                if self.tokenizer is None:
+                    from transformers import AutoTokenizer
+
+                    self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+        return self.tokenizer
+
+    def _load_model(self):
+        started_at = time.perf_counter()
+        model = BACKENDS[self.backend](self.model_name)
+        print(f"Loaded {self.model_name} ({self.backend}) in {time.perf_counter() - started_at:.1f}s")
+        return model
+
+    @contextmanager
+    def use(self):
+        """ Yield (tokenizer, model), loading the model if needed. The model is never unloaded while in use. """
+        tokenizer = self.get_tokenizer()
+
+        with self.lock:
+            if self.model is None:
+                self.model = self._load_model()
+                self._start_janitor()
+            self.active_users += 1
+            model = self.model
+
+        try:
+            yield tokenizer, model
+        finally:
+            with self.lock:
+                self.active_users -= 1
+                self.last_used_at = time.monotonic()
+
+    def warmup(self):
+        """ Load the model now (e.g. at deploy time) so the first request does not pay for it """
+        with self.use():
+            pass
+
+    def is_loaded(self):
+        return self.model is not None
+
+    def unload(self):
+        """ Free the model weights if nobody is using them. Returns True when the model was unloaded. """
+        with self.lock:
+            if self.model is None or self.active_users > 0:
+                return False
+            self.model = None
+
+        gc.collect()
+        print(f"Unloaded idle model {self.model_name}")
+        return True
+
+    def _start_janitor(self):
+        if self.idle_unload_secs <= 0 or self.janitor is not None:
+            return
+
+        self.janitor = threading.Thread(target=self._unload_when_idle, name="model-idle-unload", daemon=True)
+        self.janitor.start()
+
+    def _unload_when_idle(self):
+        while True:
+            time.sleep(min(self.idle_unload_secs, 60))
+            if self.model is not None and time.monotonic() - self.last_used_at >= self.idle_unload_secs:
+                self.unload()
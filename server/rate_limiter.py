@@ -0,0 +1,72 @@
+import threading
+import time
+from urllib.parse import urlparse
+
+
+class TokenBucket:
+    """ Thread-safe token bucket refilled at `rate` tokens per second, holding at most `capacity` tokens """
+
+    def __init__(self, rate, capacity=1):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def reserve(self, tokens=1):
+        """ Take `tokens` from the bucket and return how many seconds the caller must wait before using them """
+        with self.lock:
+            if self.rate <= 0:
+                return 0.0
+
+            self._refill(time.monotonic())
+            self.tokens -= tokens
+
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def acquire(self, tokens=1, stop_event=None):
+        """ Block until `tokens` are available. Returns False if `stop_event` was set while waiting. """
+        delay = self.reserve(tokens)
+
+        if delay <= 0:
+            return stop_event is None or not stop_event.is_set()
+
+        if stop_event is None:
+            time.sleep(delay)
+            return True
+
+        return not stop_event.wait(delay)
+
+
+class DomainRateLimiter:
+    """ One token bucket per domain, so requests to different publishers never wait on each other """
+
+    def __init__(self, min_interval_secs=1.0, burst=1):
+        self.min_interval_secs = min_interval_secs
+        self.burst = burst
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def _bucket(self, url):
+        domain = urlparse(url).netloc.lower()
+
+        with self.lock:
+            bucket = self.buckets.get(domain)
+            if bucket is None:
+                rate = 1.0 / self.min_interval_secs if self.min_interval_secs > 0 else 0
+                bucket = TokenBucket(rate, capacity=self.burst)
+                self.buckets[domain] = bucket
+            return bucket
+
+    def reserve(self, url):
+        """ Seconds to wait before requesting url, for callers that sleep themselves (e.g. asyncio.sleep) """
+        return self._bucket(url).reserve()
+
+    def acquire(self, url, stop_event=None):
+        return self._bucket(url).acquire(stop_event=stop_event)
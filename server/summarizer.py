@@ -1,20 +1,50 @@
 import os
-import requests
-from bs4 import BeautifulSoup
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+from document_store import DocumentStore
+from content_extractor import extract_main_text
+from extractive import select_salient_sentences
 import textwrap
 import unicodedata
 import re
-from google import genai
+import gemini_client
 from dotenv import load_dotenv
-from googletrans import Translator
+from translation import translate_texts_async
+from async_runtime import run_coroutine
 import asyncio
+import bisect
+import hashlib
+import json
+from disk_cache import create_disk_cache
+from config import get_env_int, get_env_float
+from model_loader import LazyModel
+from summarizer_pool import create_summarizer_pool
 
 load_dotenv()
 
 model_name = "facebook/bart-large-cnn"
-tokenizer = AutoTokenizer.from_pretrained(model_name)
-model = AutoModelForSeq2SeqLM.from_pretrained(model_name)
+
+# Loaded on first use (or warmup_summarizer), so TTS-only and Gemini-only paths never pay for BART
+summarizer_model = LazyModel(model_name, backend=os.getenv("SUMMARIZER_BACKEND", "torch").strip().lower(),
+                             idle_unload_secs=get_env_float("SUMMARIZER_IDLE_UNLOAD_SECS", 0.0))
+
+# With SUMMARIZER_WORKERS > 0 generation runs in worker processes sharing memory-mapped weights
+summarizer_pool = create_summarizer_pool(model_name, summarizer_model.backend)
+
+# Chunks summarized together in one padded generate call
+SUMMARIZER_BATCH_SIZE = get_env_int("SUMMARIZER_BATCH_SIZE", 4)
+
+# Token budget per chunk, close to the truncation limit used for every BART input
+SUMMARIZER_CHUNK_TOKENS = get_env_int("SUMMARIZER_CHUNK_TOKENS", 1000)
+
+# Keep only the most salient sentences, up to this many tokens, before chunking (0 disables the stage)
+SUMMARIZER_EXTRACTIVE_TOKENS = get_env_int("SUMMARIZER_EXTRACTIVE_TOKENS", 0)
+
+# With gemini=true, pack articles into one JSON prompt up to this many (estimated) tokens; 0 sends one prompt each
+GEMINI_BATCH_TOKENS = get_env_int("GEMINI_BATCH_TOKENS", 0)
+
+SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+# Chunk and final summaries keyed by hash(model, generation parameters, text), kept across restarts
+summary_cache = create_disk_cache("summaries", "SUMMARY_CACHE_MAX_BYTES", 64 * 1024 * 1024)
 
 
 def clean_text(text):
@@ -27,7 +57,7 @@ def clean_text(text):
 
 
 def split_text(text, max_chars=1000):
-    sentences = re.split(r'(?<=[.!?])\s+', text)  # Split by sentence
+    sentences = SENTENCE_END.split(text)  # Split by sentence
     chunks, chunk = [], ""
 
     for sentence in sentences:
@@ -44,106 +74,426 @@ def split_text(text, max_chars=1000):
     return chunks
 
 
+def split_text_by_tokens(text, max_tokens=None, reserved_tokens=0):
+    """
+    Yield chunks of whole sentences, each filled up to max_tokens - reserved_tokens model tokens.
+    The text is cleaned and tokenized once, and sentence boundaries are mapped onto the tokenizer's
+    character offsets, so chunks are plain slices of the cleaned text. A sentence longer than the
+    budget is cut at the budget.
+    """
+    if max_tokens is None:
+        max_tokens = SUMMARIZER_CHUNK_TOKENS
+    budget = max(1, max_tokens - reserved_tokens)
+
+    text = clean_text(text)
+    if not text:
+        return
+
+    encoding = summarizer_model.get_tokenizer()(text, add_special_tokens=False, return_offsets_mapping=True,
+                                                 verbose=False)
+    offsets = encoding["offset_mapping"]
+    if len(offsets) == 0:
+        return
+
+    # Index of the first token after each sentence end
+    token_starts = [start for start, _ in offsets]
+    boundaries = [bisect.bisect_left(token_starts, match.start()) for match in SENTENCE_END.finditer(text)]
+    boundaries.append(len(offsets))
+
+    chunk_start, last_boundary = 0, 0
+    for boundary in boundaries:
+        while boundary - chunk_start > budget:
+            chunk_end = last_boundary if last_boundary > chunk_start else chunk_start + budget
+            yield text[offsets[chunk_start][0]:offsets[chunk_end - 1][1]]
+            chunk_start = chunk_end
+        last_boundary = boundary
+
+    if chunk_start < len(offsets):
+        yield text[offsets[chunk_start][0]:offsets[-1][1]]
+
+
 def filter_relevant_text(chunks, article_title):
     """Keep only text that is relevant to the given article title."""
     relevant_chunks = [chunk for chunk in chunks if article_title.lower() in chunk.lower()]
     return relevant_chunks if relevant_chunks else chunks
 
 
-async def fetch_article_html(url):
-    """ Fetches raw HTML content of a given news article """
-    headers = {"User-Agent": "Mozilla/5.0"}
-    response = requests.get(url, headers=headers)
-    if response.status_code != 200:
-        return None, None
-
-    soup = BeautifulSoup(response.text, "html.parser")
+def parse_article(document):
+    """ Title and main text of a downloaded article """
+    soup = document.soup
 
     title = soup.find("h1")
     if not title:
         title = soup.find("title")
     title = title.get_text(strip=True) if title else "Failed to get title"
 
-    async with Translator() as translator:
-        translated = await translator.translate(title, dest='en')
-        title = translated.text
+    # Only the article body, not navigation, scripts, footers or related links
+    return title, extract_main_text(soup)
 
-    return title, soup.text
+
+async def fetch_article_html(url, document_store=None, translate_title=True):
+    """
+    Fetches raw HTML content of a given news article, reusing the document downloaded by the static page check.
+    translate_title=False leaves the title as is, for callers that translate many titles in one batch.
+    Runs on the async_runtime loop.
+    """
+    if document_store is None:
+        document_store = DocumentStore()
+
+    document = await document_store.get_async(url)
+    if document.status_code != 200:
+        return None, None
+
+    # Parsing is CPU work; keep it off the event loop
+    title, text = await asyncio.to_thread(parse_article, document)
+
+    if translate_title:
+        title = (await translate_texts_async([title], dest='en'))[0]
+
+    return title, text
+
+
+def warmup_summarizer():
+    """ Load the BART model (or start the worker pool) ahead of the first summarization request """
+    if summarizer_pool is not None:
+        summarizer_pool.warmup()
+    else:
+        summarizer_model.warmup()
+
+
+def summarizer_is_warm():
+    """ Whether the path warmup_summarizer prepares (worker pool or in-process model) is ready """
+    if summarizer_pool is not None:
+        return summarizer_pool.is_warm()
+    return summarizer_model.is_loaded()
 
 
 def safe_summarize(text, max_length=1000, min_length=25):
-    inputs = tokenizer(text, return_tensors="pt", truncation=True, max_length=max_length)
-    summary_ids = model.generate(**inputs, max_length=max_length, min_length=min_length, do_sample=False)
-    return tokenizer.decode(summary_ids[0], skip_special_tokens=True)
+    with summarizer_model.use() as (tokenizer, model):
+        inputs = tokenizer(text, return_tensors="pt", truncation=True, max_length=max_length)
+        summary_ids = model.generate(**inputs, max_length=max_length, min_length=min_length, do_sample=False)
+        return tokenizer.decode(summary_ids[0], skip_special_tokens=True)
+
+
+def summary_cache_key(text, max_length, min_length):
+    """ Content address of a summary: model, backend, generation parameters and the exact input text """
+    payload = json.dumps({
+        "model": model_name,
+        "backend": summarizer_model.backend,
+        "max_length": max_length,
+        "min_length": min_length,
+        "do_sample": False,
+        "text": text
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def summarize_batch(texts, max_length=1000, min_length=25, batch_size=None):
+    """
+    Summarize many texts with padded batches of generate calls. Texts are sorted by token length
+    first, so each batch holds similarly sized inputs and little compute is spent on padding.
+    """
+    if batch_size is None:
+        batch_size = SUMMARIZER_BATCH_SIZE
+
+    if len(texts) == 0:
+        return []
+
+    tokenizer = summarizer_model.get_tokenizer()
+    lengths = [len(ids) for ids in tokenizer(texts, truncation=True, max_length=max_length)["input_ids"]]
+    order = sorted(range(len(texts)), key=lambda index: lengths[index])
+
+    batches = [order[start:start + batch_size] for start in range(0, len(order), batch_size)]
+    summaries = [None] * len(texts)
+
+    if summarizer_pool is not None:
+        # Worker processes pick batches from the pool queue, batches from concurrent requests interleave
+        futures = [summarizer_pool.submit([texts[index] for index in batch_indexes], max_length, min_length)
+                   for batch_indexes in batches]
+        for batch_indexes, future in zip(batches, futures):
+            for index, summary in zip(batch_indexes, future.result()):
+                summaries[index] = summary
+        return summaries
+
+    with summarizer_model.use() as (tokenizer, model):
+        for batch_indexes in batches:
+            inputs = tokenizer([texts[index] for index in batch_indexes], return_tensors="pt", truncation=True,
+                               max_length=max_length, padding=True)
+            summary_ids = model.generate(**inputs, max_length=max_length, min_length=min_length, do_sample=False)
+
+            for index, summary in zip(batch_indexes, tokenizer.batch_decode(summary_ids, skip_special_tokens=True)):
+                summaries[index] = summary
+
+    return summaries
+
+
+def cached_summarize_batch(texts, max_length=1000, min_length=25):
+    """ summarize_batch backed by the persistent summary cache, so repeated chunks are generated only once """
+    keys = [summary_cache_key(text, max_length, min_length) for text in texts]
+    found = {}
+
+    if summary_cache is not None:
+        for key in set(keys):
+            entry = summary_cache.get(key)
+            if entry is not None:
+                found[key] = entry[0].decode("utf-8")
+
+    # Identical texts inside one batch are generated once as well
+    missing = {}
+    for key, text in zip(keys, texts):
+        if key not in found:
+            missing.setdefault(key, text)
+
+    if missing:
+        generated = summarize_batch(list(missing.values()), max_length=max_length, min_length=min_length)
+        for key, summary in zip(missing.keys(), generated):
+            found[key] = summary
+            if summary_cache is not None:
+                summary_cache.set(key, summary.encode("utf-8"))
+
+    return [found[key] for key in keys]
+
+
+def cached_summarize(text, max_length=1000, min_length=25):
+    return cached_summarize_batch([text], max_length=max_length, min_length=min_length)[0]
+
+
+def fetch_article(url, document_store=None, translate_title=True):
+    """ Synchronous wrapper around fetch_article_html """
+    return run_coroutine(fetch_article_html(url, document_store, translate_title=translate_title))
 
 
 def summarize_article_content(url, use_gemini=False):
-    article_title, article_text = asyncio.run(fetch_article_html(url))
+    article_title, article_text = fetch_article(url)
+    return summarize_article_text(article_title, article_text, use_gemini=use_gemini)
 
-    if article_title is None and article_text is None:
-        return {"Title": None, "Summary": "Error in summarization."}
 
-    if use_gemini:
-        gemini_response = summarize_article_content_with_gemini(article_title, article_text)
-        if "Failed to summarize article due to" not in gemini_response["Summary"]:
-            return gemini_response
-        else:
-            print("ERROR IN gemini_response")
+def summarize_article_text(article_title, article_text, use_gemini=False):
+    """ Summarization stage: summarize an article which is already downloaded """
+    return summarize_articles_text([(article_title, article_text)], use_gemini=use_gemini)[0]
 
-    chunks = split_text(article_text, max_chars=1000)
 
-    # filtered_chunks = filter_relevant_text(chunks, article_title)
-    filtered_chunks = chunks
+def summarize_articles_text(articles, use_gemini=False):
+    """
+    Summarize several downloaded articles, given as (title, text) pairs, together. The chunks of all
+    articles share batched generate calls, then the reduce step runs as one more batch.
+    """
+    results = [None] * len(articles)
+    pending = []
 
-    try:
-        summaries = [safe_summarize(f"{article_title} - {chunk}") for chunk in filtered_chunks]
+    for index, (article_title, article_text) in enumerate(articles):
+        if article_title is None and article_text is None:
+            results[index] = {"Title": None, "Summary": "Error in summarization."}
+            continue
+
+        pending.append(index)
 
-        final_summary = safe_summarize(" ".join(summaries), max_length=1000, min_length=50)
+    if use_gemini and pending:
+        gemini_responses = summarize_articles_with_gemini([articles[index] for index in pending])
 
-        return {"Title": clean_text(article_title), "Summary": clean_text(final_summary)}
+        # Articles Gemini failed on fall back to BART
+        bart_pending = []
+        for index, gemini_response in zip(pending, gemini_responses):
+            if "Failed to summarize article due to" not in gemini_response["Summary"]:
+                results[index] = gemini_response
+            else:
+                print("ERROR IN gemini_response")
+                bart_pending.append(index)
+        pending = bart_pending
+
+    if not pending:
+        return results
+
+    try:
+        summaries = summarize_with_bart([articles[index] for index in pending])
     except Exception as e:
         print(f"Summarization failed: {e}")
-        return {"Title": clean_text(article_title), "Summary": "Error in summarization."}
+        summaries = [None] * len(pending)
+
+        # Retry one by one, so a single bad article does not fail the whole batch
+        if len(pending) > 1:
+            for position, index in enumerate(pending):
+                try:
+                    summaries[position] = summarize_with_bart([articles[index]])[0]
+                except Exception as article_error:
+                    print(f"Summarization failed: {article_error}")
+
+    for index, final_summary in zip(pending, summaries):
+        article_title = clean_text(articles[index][0])
+        if final_summary is None:
+            results[index] = {"Title": article_title, "Summary": "Error in summarization."}
+        else:
+            results[index] = {"Title": article_title, "Summary": clean_text(final_summary)}
 
+    return results
 
-def summarize_article_content_with_gemini(article_title, article_text):
+
+def summarize_with_bart(articles):
+    """ Map-reduce summaries of (title, text) pairs, with the chunks of all articles batched together """
+    chunk_inputs, chunk_owners = [], []
+    tokenizer = summarizer_model.get_tokenizer()
+    for position, (article_title, article_text) in enumerate(articles):
+        # Optional extractive pass bounds BART work for very long pages
+        if SUMMARIZER_EXTRACTIVE_TOKENS > 0:
+            article_text = select_salient_sentences(article_text, SUMMARIZER_EXTRACTIVE_TOKENS)
+
+        # Room for the "title - " prefix and the special tokens in every chunk
+        reserved_tokens = len(tokenizer(f"{article_title} - ")["input_ids"])
+        chunks = split_text_by_tokens(article_text, reserved_tokens=reserved_tokens)
+
+        # filtered_chunks = filter_relevant_text(chunks, article_title)
+        filtered_chunks = chunks
+
+        for chunk in filtered_chunks:
+            chunk_inputs.append(f"{article_title} - {chunk}")
+            chunk_owners.append(position)
+
+    # Unchanged chunks (re-queries, syndicated copies, small edits) come straight from the cache
+    chunk_summaries = cached_summarize_batch(chunk_inputs)
+
+    joined_summaries = [[] for _ in articles]
+    for position, summary in zip(chunk_owners, chunk_summaries):
+        joined_summaries[position].append(summary)
+
+    return cached_summarize_batch([" ".join(summaries) for summaries in joined_summaries],
+                                  max_length=1000, min_length=50)
+
+
+async def summarize_article_content_with_gemini_async(article_title, article_text):
     final_summary = ""
     try:
-        GEMINI_API_KEY = os.getenv("GEMINI_AI_API_KEY")
-
-        if GEMINI_API_KEY is None:
+        if not gemini_client.is_available():
             return {"Title": clean_text(article_title),
                     "Summary": f"Failed to summarize article due to Gemini model is unavailable."}
 
-        client = genai.Client(api_key=GEMINI_API_KEY)
-        response = client.models.generate_content(
-            model="gemini-2.0-flash",
-            contents=f"""
+        final_summary = await gemini_client.generate_async(f"""
 Summarize this below article which is scrapped from webpage. 
 Identify content related to title and summarize and ignore redundant data. 
 Given response in **simple text**
 
 Title: {article_title}
 text: {article_text}
-""",
-        )
-        final_summary = response.text
+""")
         return {"Title": clean_text(article_title), "Summary": final_summary}
     except Exception as e:
         print(f"Error in summarizing article with Gemini: {e}")
-        if len(final_summary) > 0:
+        if final_summary is not None and len(final_summary) > 0:
             return {"Title": article_title, "Summary": final_summary}
         return {"Title": clean_text(article_title), "Summary": f"Failed to summarize article due to {e}"}
 
 
+def summarize_article_content_with_gemini(article_title, article_text):
+    return run_coroutine(summarize_article_content_with_gemini_async(article_title, article_text))
+
+
+def pack_gemini_batches(articles, max_tokens):
+    """ Group article positions so every group fits max_tokens (estimated); an oversized article is a group alone """
+    batches, current, current_tokens = [], [], 0
+    for position, (article_title, article_text) in enumerate(articles):
+        tokens = gemini_client.estimate_prompt_tokens(f"{article_title}\n{article_text}")
+        if current and current_tokens + tokens > max_tokens:
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(position)
+        current_tokens += tokens
+
+    if current:
+        batches.append(current)
+    return batches
+
+
+def parse_gemini_batch_summaries(response_text):
+    """ {article id: summary} from a batch response; ids with a missing or empty summary are left out """
+    text = response_text.strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[-1].rsplit("```", 1)[0]
+
+    data = json.loads(text)
+    if isinstance(data, dict):
+        data = next((value for value in data.values() if isinstance(value, list)), [])
+
+    summaries = {}
+    for item in data:
+        if not isinstance(item, dict) or not isinstance(item.get("summary"), str) or not item["summary"].strip():
+            continue
+        try:
+            summaries[int(item.get("id"))] = item["summary"].strip()
+        except (TypeError, ValueError):
+            continue
+    return summaries
+
+
+async def summarize_gemini_batch_async(articles):
+    """ One JSON prompt for several (title, text) pairs; the summary of every article, None where it is missing """
+    packed_articles = "\n\n".join(f"""<article id="{article_id}">
+Title: {article_title}
+text: {article_text}
+</article>""" for article_id, (article_title, article_text) in enumerate(articles, start=1))
+
+    prompt = f"""
+Summarize each of the below articles which are scrapped from webpages. 
+For every article identify content related to its title and summarize it in simple text, ignoring redundant data.
+Respond with JSON only: a list with one object per article, {{"id": <article id>, "summary": "<summary>"}}.
+
+{packed_articles}
+"""
+
+    try:
+        summaries = parse_gemini_batch_summaries(await gemini_client.generate_async(prompt, json_output=True))
+    except Exception as e:
+        print(f"Error in batch summarizing articles with Gemini: {e}")
+        summaries = {}
+
+    return [summaries.get(article_id) for article_id in range(1, len(articles) + 1)]
+
+
+async def summarize_articles_with_gemini_async(articles, batch_tokens):
+    if batch_tokens <= 0:
+        return await asyncio.gather(*[summarize_article_content_with_gemini_async(article_title, article_text)
+                                      for article_title, article_text in articles])
+
+    if not gemini_client.is_available():
+        return [{"Title": clean_text(article_title),
+                 "Summary": "Failed to summarize article due to Gemini model is unavailable."}
+                for article_title, _ in articles]
+
+    batches = [batch for batch in pack_gemini_batches(articles, batch_tokens) if len(batch) > 1]
+    batch_summaries = await asyncio.gather(*[summarize_gemini_batch_async([articles[position] for position in batch])
+                                             for batch in batches])
+
+    results = [None] * len(articles)
+    for batch, summaries in zip(batches, batch_summaries):
+        for position, summary in zip(batch, summaries):
+            if summary is not None:
+                results[position] = {"Title": clean_text(articles[position][0]), "Summary": summary}
+
+    # Articles alone in their batch, or missing / unparsable in the batch response, get their own request
+    retry_positions = [position for position, result in enumerate(results) if result is None]
+    retried = await asyncio.gather(*[summarize_article_content_with_gemini_async(*articles[position])
+                                     for position in retry_positions])
+    for position, result in zip(retry_positions, retried):
+        results[position] = result
+
+    return results
+
+
+def summarize_articles_with_gemini(articles, batch_tokens=None):
+    """
+    Gemini summaries of several (title, text) pairs, requested concurrently within the rate limits.
+    With batch_tokens > 0 (default GEMINI_BATCH_TOKENS) articles are packed into JSON batch prompts.
+    """
+    if batch_tokens is None:
+        batch_tokens = GEMINI_BATCH_TOKENS
+
+    return run_coroutine(summarize_articles_with_gemini_async(articles, batch_tokens))
+
+
 def all_articles_summary_with_gemini(data):
 
     final_summary = ""
 
     try:
-        GEMINI_API_KEY = os.getenv("GEMINI_AI_API_KEY")
-
-        if GEMINI_API_KEY is None:
+        if not gemini_client.is_available():
             return False, f"Gemini model is currently unavailable, so the articles couldn't be summarized."
 
         prompt = f"""
@@ -164,14 +514,7 @@ Summarized data of all articles:
 {data}
 """
 
-        client = genai.Client(api_key=GEMINI_API_KEY)
-
-        response = client.models.generate_content(
-            model="gemini-2.0-flash",
-            contents=prompt
-        )
-
-        final_summary = response.text
+        final_summary = gemini_client.generate(prompt)
 
         if final_summary is None:
             return False, f"Failed to summarize and provide insights of all the articles."
@@ -189,9 +532,7 @@ def all_articles_comparative_analysis_with_gemini(data):
     final_summary = ""
 
     try:
-        GEMINI_API_KEY = os.getenv("GEMINI_AI_API_KEY")
-
-        if GEMINI_API_KEY is None:
+        if not gemini_client.is_available():
             return False, f"Gemini model is currently unavailable, so the articles couldn't be analyzed."
 
         prompt = f"""
@@ -212,14 +553,7 @@ Summarized data of all articles:
 {data}
 """
 
-        client = genai.Client(api_key=GEMINI_API_KEY)
-
-        response = client.models.generate_content(
-            model="gemini-2.0-flash",
-            contents=prompt
-        )
-
-        final_summary = response.text
+        final_summary = gemini_client.generate(prompt)
 
         if final_summary is None:
             return False, f"Failed to provide comparative analysis."
@@ -0,0 +1,226 @@
+import json
+import mmap
+import multiprocessing
+import os
+import struct
+import threading
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from config import get_env_int
+from disk_cache import CACHE_DIR
+from model_loader import BACKENDS, load_torch_model
+
+# Summarization worker processes; 0 keeps generation in the calling process
+SUMMARIZER_WORKERS = get_env_int("SUMMARIZER_WORKERS", 0)
+
+# torch intra-op threads per worker, so workers split the cores instead of fighting over them
+SUMMARIZER_TORCH_THREADS = get_env_int("SUMMARIZER_TORCH_THREADS",
+                                       max(1, (os.cpu_count() or 1) // max(1, SUMMARIZER_WORKERS)))
+
+SAFETENSORS_DTYPES = {
+    "F32": "float32", "F16": "float16", "BF16": "bfloat16", "F64": "float64",
+    "I64": "int64", "I32": "int32", "I16": "int16", "I8": "int8", "U8": "uint8", "BOOL": "bool"
+}
+
+# Per worker process state, set by _init_worker
+worker_tokenizer = None
+worker_model = None
+
+
+def export_shared_weights(model_name):
+    """ Save the fp32 weights once as a single safetensors file that workers memory-map """
+    export_dir = os.path.join(CACHE_DIR, "shared-weights", model_name.replace("/", "--"))
+    weights_path = os.path.join(export_dir, "model.safetensors")
+    if os.path.isfile(weights_path):
+        return weights_path
+
+    from safetensors.torch import save_file
+
+    # Tied tensors (shared embeddings, lm_head) are stored once, the other names become aliases
+    tensors, aliases, stored_names = {}, {}, {}
+    for name, tensor in load_torch_model(model_name).state_dict().items():
+        key = (tensor.data_ptr(), tuple(tensor.shape), tensor.dtype)
+        if key in stored_names:
+            aliases[name] = stored_names[key]
+        else:
+            stored_names[key] = name
+            tensors[name] = tensor.contiguous()
+
+    os.makedirs(export_dir, exist_ok=True)
+    temp_path = f"{weights_path}.{os.getpid()}.tmp"
+    save_file(tensors, temp_path, metadata={"aliases": json.dumps(aliases)})
+    os.replace(temp_path, weights_path)
+    return weights_path
+
+
+def load_mmap_state_dict(weights_path):
+    """
+    State dict whose tensors point straight into a read-only mmap of the safetensors file.
+    Nothing is copied, so every worker mapping the same file shares the same page cache pages.
+    """
+    import torch
+
+    with open(weights_path, "rb") as file:
+        header_size = struct.unpack("<Q", file.read(8))[0]
+        header = json.loads(file.read(header_size))
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    data_start = 8 + header_size
+    state_dict = {}
+
+    with warnings.catch_warnings():
+        # The buffer is read-only on purpose; inference never writes to the weights
+        warnings.filterwarnings("ignore", message="The given buffer is not writable")
+
+        for name, info in header.items():
+            if name == "__metadata__":
+                continue
+
+            dtype = getattr(torch, SAFETENSORS_DTYPES[info["dtype"]])
+            start, end = info["data_offsets"]
+            if end == start:
+                state_dict[name] = torch.empty(info["shape"], dtype=dtype)
+                continue
+
+            count = (end - start) // torch.empty((), dtype=dtype).element_size()
+            tensor = torch.frombuffer(buffer, dtype=dtype, count=count, offset=data_start + start)
+            state_dict[name] = tensor.reshape(info["shape"])
+
+    for alias, name in json.loads(header.get("__metadata__", {}).get("aliases", "{}")).items():
+        state_dict[alias] = state_dict[name]
+
+    return state_dict
+
+
+def load_shared_model(model_name, weights_path):
+    """ Build the model skeleton without allocating weights, then assign the memory-mapped tensors """
+    import torch
+    from transformers import AutoConfig, AutoModelForSeq2SeqLM, GenerationConfig
+
+    config = AutoConfig.from_pretrained(model_name)
+    with torch.device("meta"):
+        model = AutoModelForSeq2SeqLM.from_config(config)
+
+    model.load_state_dict(load_mmap_state_dict(weights_path), strict=False, assign=True)
+    model.tie_weights()
+
+    meta_tensors = [name for name, tensor in list(model.named_parameters()) + list(model.named_buffers())
+                    if tensor.is_meta]
+    if meta_tensors:
+        raise RuntimeError(f"Weights missing from {weights_path}: {', '.join(meta_tensors[:5])}")
+
+    try:
+        model.generation_config = GenerationConfig.from_pretrained(model_name)
+    except OSError:
+        pass
+
+    model.eval()
+    return model
+
+
+def _init_worker(model_name, backend, weights_path, torch_threads):
+    import torch
+    from transformers import AutoTokenizer
+
+    global worker_tokenizer, worker_model
+
+    torch.set_num_threads(torch_threads)
+    worker_tokenizer = AutoTokenizer.from_pretrained(model_name)
+
+    if weights_path is not None:
+        worker_model = load_shared_model(model_name, weights_path)
+    else:
+        worker_model = BACKENDS[backend](model_name)
+
+
+def _generate_batch(texts, max_length, min_length):
+    inputs = worker_tokenizer(texts, return_tensors="pt", truncation=True, max_length=max_length, padding=True)
+    summary_ids = worker_model.generate(**inputs, max_length=max_length, min_length=min_length, do_sample=False)
+    return worker_tokenizer.batch_decode(summary_ids, skip_special_tokens=True)
+
+
+def _ping():
+    """ pid of a worker whose initializer finished loading the model """
+    if worker_model is None or worker_tokenizer is None:
+        raise RuntimeError("Summarizer worker has no model loaded")
+
+    # Long enough that the warmup pings spread over all workers instead of one fast starter
+    time.sleep(0.1)
+    return os.getpid()
+
+
+class SummarizerPool:
+    """
+    Fixed set of worker processes that run BART generate calls submitted over the executor's queue.
+    With the torch backend the fp32 weights are memory-mapped from one safetensors file, so N workers
+    cost about one copy of the weights in RAM. Other backends build their own model in every worker.
+    """
+
+    def __init__(self, model_name, backend, workers, torch_threads):
+        self.model_name = model_name
+        self.backend = backend
+        self.workers = workers
+        self.torch_threads = torch_threads
+        self.executor = None
+        self.warm = False
+        self.lock = threading.Lock()
+
+    def _get_executor(self):
+        with self.lock:
+            if self.executor is None:
+                weights_path = export_shared_weights(self.model_name) if self.backend == "torch" else None
+                self.executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.model_name, self.backend, weights_path, self.torch_threads)
+                )
+            return self.executor
+
+    def _reset(self, executor):
+        """ Drop a broken executor (e.g. a worker was OOM-killed) so the next call starts fresh workers """
+        with self.lock:
+            if self.executor is not executor:
+                return  # Already replaced by another thread
+            self.executor = None
+            self.warm = False
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, texts, max_length=1000, min_length=25):
+        """ Queue one padded batch; returns a future with the decoded summaries in input order """
+        executor = self._get_executor()
+        try:
+            return executor.submit(_generate_batch, texts, max_length, min_length)
+        except BrokenProcessPool:
+            print("Warning: Summarizer worker pool is broken. Restarting it.")
+            self._reset(executor)
+            return self._get_executor().submit(_generate_batch, texts, max_length, min_length)
+
+    def warmup(self):
+        """ Start every worker and wait until each of them has confirmed its model load """
+        executor = self._get_executor()
+        pids = set()
+        try:
+            # A worker still loading takes no pings, so rounds repeat until every worker has answered one
+            while len(pids) < self.workers:
+                futures = [executor.submit(_ping) for _ in range(self.workers * 2)]
+                pids.update(future.result() for future in futures)
+        except BrokenProcessPool:
+            self._reset(executor)
+            raise
+
+        self.warm = True
+        return pids
+
+    def is_warm(self):
+        """ True once warmup has heard from every worker with its model loaded """
+        return self.warm
+
+
+def create_summarizer_pool(model_name, backend):
+    if SUMMARIZER_WORKERS <= 0:
+        return None
+
+    return SummarizerPool(model_name, backend, SUMMARIZER_WORKERS, SUMMARIZER_TORCH_THREADS)
@@ -1,58 +1,161 @@
 from gtts import gTTS
-from langdetect import detect
-from googletrans import Translator
 import gradio as gr
-import asyncio
+import atexit
 import os
-import time
-import random
+import hashlib
+import json
+import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from config import get_env_int, get_env_float
+from rate_limiter import TokenBucket
+from translation import translate, translate_texts
+from audio_store import AudioStore
 
 AUDIO_DIR = "audio"
-os.makedirs(AUDIO_DIR, exist_ok=True)
+
+# Returned by generate_audio when synthesis failed; never cached
+FAILED_AUDIO_FILES = ("failed_hi.mp3", "failed_en.mp3")
+
+# Generated audio is capped in size (least recently used files go first) and age, see AudioStore
+audio_store = AudioStore(AUDIO_DIR, max_bytes=get_env_int("AUDIO_MAX_BYTES", 512 * 1024 * 1024),
+                         max_age_secs=get_env_float("AUDIO_MAX_AGE_SECS", 7200.0))
+atexit.register(audio_store.save_index)
+
+# gTTS voice: the Google Translate domain used for the accent (com, co.in, co.uk, ...)
+TTS_TLD = os.getenv("TTS_TLD", "com")
+
+# Audio clips generated at the same time (submit_audio), independent of how many requests are running
+AUDIO_WORKERS = get_env_int("AUDIO_WORKERS", 4)
+audio_executor = ThreadPoolExecutor(max_workers=AUDIO_WORKERS, thread_name_prefix="audio")
+
+# Requests per second (and burst) allowed to the Google TTS endpoint, shared by all workers
+tts_rate_limiter = TokenBucket(get_env_float("TTS_RATE_PER_SEC", 2.0), capacity=get_env_int("TTS_BURST", 2))
+
+# Streamed audio (iter_audio_chunks) is synthesized in sentence groups of about this many characters
+TTS_STREAM_CHUNK_CHARS = get_env_int("TTS_STREAM_CHUNK_CHARS", 300)
+SENTENCE_END = re.compile(r'(?<=[.!?\u0964])\s+|\n+')
+
+# Audio key -> Future of the file being synthesized, so concurrent requests for the same audio share one synthesis
+audio_in_flight = {}
+audio_in_flight_lock = threading.Lock()
 
 
 # Daemon background running process, to remove old audio files to save storage
-def clean_old_audio(max_age_seconds=7200):  # 2 hour
-    """Removes audio files older than max_age_seconds."""
-    now = time.time()
-    for filename in os.listdir(AUDIO_DIR):
-        if filename.endswith(".mp3"):
-            filepath = os.path.join(AUDIO_DIR, filename)
-            try:
-                timestamp = int(filename.split("_")[0])
-                if now - timestamp > max_age_seconds:
-                    os.remove(filepath)
-            except (ValueError, IndexError):
-                print(f"Skipping file with invalid name: {filename}")
+def clean_old_audio(max_age_seconds=None):
+    """Removes audio files not used (created or served from cache) for max_age_seconds (default AUDIO_MAX_AGE_SECS)."""
+    audio_store.expire(max_age_seconds)
+    audio_store.save_index()
+
+
+def audio_path(text, lang, tld=TTS_TLD):
+    """ Content-addressed file name: the same text, language and voice always map to the same file """
+    key = hashlib.sha256(json.dumps([text, lang, tld]).encode("utf-8")).hexdigest()
+    return f"{AUDIO_DIR}/{key}.mp3"
 
 
 def generate_audio(text, lang="hi"):
-    try:
-        text = asyncio.run(translate_text(text, lang))
-        tts = gTTS(text, lang=lang)
-        timestamp = int(time.time())  # Current timestamp
-        random_value = random.randint(1000, 9999)
-        filename = f"{AUDIO_DIR}/{timestamp}_{random_value}.mp3"
-        tts.save(filename)
-        time.sleep(1)
+    filename = audio_path(text, lang)
+
+    if audio_store.lookup(filename):
         return filename
-    except Exception as e:
-        print(f"Error generating audio: {e}")
-        return "failed_hi.mp3" if lang == "hi" else "failed_en.mp3"
 
+    with audio_in_flight_lock:
+        future = audio_in_flight.get(filename)
+        owner = future is None
+        if owner:
+            future = audio_in_flight[filename] = Future()
+
+    if not owner:
+        return future.result()
+
+    try:
+        result = synthesize_audio(text, lang, filename)
+        future.set_result(result)
+        return result
+    finally:
+        with audio_in_flight_lock:
+            audio_in_flight.pop(filename, None)
+
+
+def submit_audio(text, lang="hi"):
+    """ generate_audio on the shared audio executor; returns a future of the file name """
+    return audio_executor.submit(generate_audio, text, lang)
+
+
+def split_audio_text(text, max_chars=TTS_STREAM_CHUNK_CHARS):
+    """
+    Group whole sentences into pieces of about max_chars, the unit synthesized by iter_audio_chunks.
+    The first piece is only the first sentence, so playback can start as early as possible.
+    """
+    groups, current = [], ""
+    for sentence in SENTENCE_END.split(text.strip()):
+        if current and (not groups or len(current) + len(sentence) + 1 > max_chars):
+            groups.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+
+    if current:
+        groups.append(current)
+    return groups
+
+
+def iter_audio_chunks(text, lang="hi", read_size=64 * 1024):
+    """
+    Yield the MP3 bytes of text in order while later sentence groups are still being synthesized.
+    Every group is its own cached clip; MP3 frames can simply be concatenated into one playable stream.
+    """
+    groups = split_audio_text(text)
+
+    # One batched translation request for all groups; every clip then finds its translation in the cache
+    translate_texts(groups, dest=lang)
+    futures = [submit_audio(group, lang) for group in groups]
 
-async def translate_text(text, target_lang='hi'):
     try:
-        detected_lang = detect(text)
-        translated_text = text
+        produced = False
+        for index, future in enumerate(futures):
+            filename = future.result()
+            if filename in FAILED_AUDIO_FILES:
+                print(f"Error: Failed to synthesize audio group {index + 1} of {len(groups)}. Skipping it.")
+                continue
+
+            with open(filename, "rb") as file:
+                while chunk := file.read(read_size):
+                    produced = True
+                    yield chunk
+
+        if not produced:
+            raise RuntimeError("No audio could be generated for the text.")
+    finally:
+        # Client went away: skip the groups that have not started
+        for future in futures:
+            future.cancel()
+
 
-        if detected_lang != target_lang:
-            async with Translator() as translator:
-                translated = await translator.translate(text, src=detected_lang, dest=target_lang)
-                translated_text = translated.text
+def synthesize_audio(text, lang, filename):
+    # Written next to the final file and renamed, so readers never see a partly written mp3
+    temp_filename = f"{filename}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        text = translate(text, dest=lang)
+        tts = gTTS(text, lang=lang, tld=TTS_TLD)
 
-        return translated_text
+        # gTTS sends one request per chunk of at most 100 characters, when the stream is advanced to it,
+        # so every chunk takes its own token (the last token taken only finds the stream exhausted)
+        chunks = tts.stream()
+        with open(temp_filename, "wb") as file:
+            while True:
+                tts_rate_limiter.acquire()
+                chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                file.write(chunk)
 
+        os.replace(temp_filename, filename)
+        audio_store.add(filename)
+        return filename
     except Exception as e:
-        print(f"Translation error: {e}")
-        return text
+        print(f"Error generating audio: {e}")
+        if os.path.exists(temp_filename):
+            os.remove(temp_filename)
+        return "failed_hi.mp3" if lang == "hi" else "failed_en.mp3"
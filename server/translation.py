@@ -0,0 +1,218 @@
+import asyncio
+import hashlib
+import json
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from googletrans import Translator
+from langdetect import DetectorFactory, detect
+from config import get_env_int, get_env_float
+from disk_cache import create_disk_cache
+from rate_limiter import TokenBucket
+from async_runtime import run_coroutine
+
+# langdetect is randomized unless seeded; memoized results must be stable
+DetectorFactory.seed = 0
+
+# Requests per second (and burst) allowed to Google Translate, shared by every caller
+translate_rate_limiter = TokenBucket(get_env_float("TRANSLATE_RATE_PER_SEC", 2.0),
+                                     capacity=get_env_int("TRANSLATE_BURST", 2))
+
+# Strings joined into one Google Translate request (the endpoint accepts about 5000 characters)
+TRANSLATE_BATCH_CHARS = 4500
+
+TRANSLATION_MEMORY_ENTRIES = get_env_int("TRANSLATION_MEMORY_ENTRIES", 4096)
+translation_cache = create_disk_cache("translations", "TRANSLATION_CACHE_MAX_BYTES", 16 * 1024 * 1024)
+
+WORD = re.compile(r"[a-z]+")
+ENGLISH_WORDS = {
+    "the", "a", "an", "and", "or", "of", "to", "in", "on", "for", "with", "by", "at", "from", "as", "is", "are",
+    "was", "were", "be", "has", "have", "its", "it", "this", "that", "after", "over", "new", "says", "will"
+}
+# A single shared word ("a", "in", "on") proves nothing; skip langdetect only when English words dominate
+ENGLISH_MIN_WORDS = 4
+ENGLISH_MIN_MATCHES = 2
+ENGLISH_WORD_RATIO = 0.25
+
+
+class TranslationMemory:
+    """ Thread-safe LRU of recent translations in front of the disk cache """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            value = self.entries.get(key)
+            if value is not None:
+                self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+
+translation_memory = TranslationMemory(TRANSLATION_MEMORY_ENTRIES)
+
+# googletrans keeps an httpx client bound to the loop it first runs on, so one Translator lives on the runtime loop
+translator = None
+
+
+def get_translator():
+    global translator
+
+    if translator is None:
+        translator = Translator()
+    return translator
+
+
+def looks_english(text):
+    """ Cheap check before any detection: ASCII text in which common English words make up a large share """
+    if not text.isascii():
+        return False
+
+    words = WORD.findall(text.lower())
+    if len(words) < ENGLISH_MIN_WORDS:
+        return False  # Too short to tell, let langdetect decide
+
+    matches = sum(word in ENGLISH_WORDS for word in words)
+    return matches >= ENGLISH_MIN_MATCHES and matches / len(words) >= ENGLISH_WORD_RATIO
+
+
+@lru_cache(maxsize=4096)
+def detect_language(text):
+    """ Memoized langdetect; None when the language cannot be detected """
+    if looks_english(text):
+        return "en"
+
+    try:
+        return detect(text)
+    except Exception:
+        return None
+
+
+def translation_key(text, src, dest):
+    return hashlib.sha256(json.dumps([text, src, dest]).encode("utf-8")).hexdigest()
+
+
+def _cached_translation(key):
+    translated = translation_memory.get(key)
+    if translated is None and translation_cache is not None:
+        entry = translation_cache.get(key)
+        if entry is not None:
+            translated = entry[0].decode("utf-8")
+            translation_memory.set(key, translated)
+    return translated
+
+
+def _store_translation(key, translated):
+    translation_memory.set(key, translated)
+    if translation_cache is not None:
+        translation_cache.set(key, translated.encode("utf-8"))
+
+
+def _batches(texts):
+    """ Group texts into newline-joined requests; texts containing newlines are sent on their own """
+    batch, batch_chars = [], 0
+    for text in texts:
+        if "\n" in text or len(text) >= TRANSLATE_BATCH_CHARS:
+            yield [text]
+            continue
+
+        if batch and batch_chars + len(text) + 1 > TRANSLATE_BATCH_CHARS:
+            yield batch
+            batch, batch_chars = [], 0
+        batch.append(text)
+        batch_chars += len(text) + 1
+
+    if batch:
+        yield batch
+
+
+async def _translate_batch(translator, texts, src, dest):
+    await asyncio.sleep(translate_rate_limiter.reserve())
+    translated = await translator.translate("\n".join(texts), src=src, dest=dest)
+    if len(texts) == 1:
+        return [translated.text]
+
+    lines = translated.text.split("\n")
+    if len(lines) == len(texts):
+        return lines
+
+    # The service merged or split lines, so the joined result cannot be mapped back; one string per request
+    await asyncio.sleep(translate_rate_limiter.reserve(len(texts)))
+    return [item.text for item in await translator.translate(texts, src=src, dest=dest)]
+
+
+def _lookup_translations(texts, dest, src):
+    """ Detection and cache lookups: (results with known translations filled in, pending {(src, text): positions}) """
+    results = list(texts)
+    pending = {}  # (src, text) -> [positions], each distinct text is translated once
+
+    for position, text in enumerate(texts):
+        if not text or not text.strip():
+            continue
+
+        text_src = src or detect_language(text) or "auto"
+        if text_src == dest:
+            continue
+
+        translated = _cached_translation(translation_key(text, text_src, dest))
+        if translated is not None:
+            results[position] = translated
+        else:
+            pending.setdefault((text_src, text), []).append(position)
+
+    return results, pending
+
+
+def _store_translations(texts, translations, src, dest):
+    for text, translated in zip(texts, translations):
+        _store_translation(translation_key(text, src, dest), translated)
+
+
+async def translate_texts_async(texts, dest, src=None):
+    """
+    Translate texts to dest, returned in the same order. Text that is already in dest is returned
+    as is, known translations come from memory or disk, and the rest is grouped by source language
+    into a few batched requests. A text that fails to translate is returned unchanged.
+    Runs on the async_runtime loop (translate_texts from synchronous code); langdetect and the disk
+    cache run in worker threads so they never stall the loop.
+    """
+    results, pending = await asyncio.to_thread(_lookup_translations, texts, dest, src)
+    if not pending:
+        return results
+
+    by_src = {}
+    for text_src, text in pending:
+        by_src.setdefault(text_src, []).append(text)
+
+    for text_src, src_texts in by_src.items():
+        for batch in _batches(src_texts):
+            try:
+                translated_batch = await _translate_batch(get_translator(), batch, text_src, dest)
+            except Exception as e:
+                print(f"Translation error: {e}")
+                continue
+
+            await asyncio.to_thread(_store_translations, batch, translated_batch, text_src, dest)
+            for text, translated in zip(batch, translated_batch):
+                for position in pending[(text_src, text)]:
+                    results[position] = translated
+
+    return results
+
+
+def translate_texts(texts, dest, src=None):
+    return run_coroutine(translate_texts_async(texts, dest, src=src))
+
+
+def translate(text, dest, src=None):
+    return translate_texts([text], dest, src=src)[0]
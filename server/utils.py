@@ -1,13 +1,12 @@
-import os
 import re
 import markdown
-import threading
-from text_to_speech import clean_old_audio, generate_audio
+from concurrent.futures import as_completed
+from text_to_speech import audio_store, submit_audio
+from config import get_env_float
 from dotenv import load_dotenv
-from comparative_analysis import compare_sentiments
-from model import fetch_news
+from comparative_analysis import compare_sentiments, add_sentiment
+from model import fetch_news, iter_news_articles
 import gradio as gr
-import time
 
 load_dotenv()
 
@@ -23,6 +22,16 @@ def get_news_summary_sentiment(company, max_articles=10, skip=0, use_gemini=Fals
     return articles, summary
 
 
+def iter_news_summary_sentiment(company, max_articles=10, skip=0, use_gemini=False):
+    """
+    Yield (index, article) with its sentiment as soon as each article is summarized; index is the article's
+    position in the search results, the order get_news_summary_sentiment returns them in
+    """
+    for index, article in iter_news_articles(company, max_articles=max_articles, skip=skip, use_gemini=use_gemini):
+        add_sentiment(article)
+        yield index, article
+
+
 def display_news(articles):
     with gr.Blocks() as news_block:
         with gr.Column():
@@ -37,10 +46,32 @@ def display_news(articles):
     return news_block
 
 
-def analyze_company(company, max_articles=10, skip=0, use_gemini=False):
+def format_sentiment_summary(sentiment_summary):
+    return (f"Positive: {sentiment_summary['Positive']}, Negative: {sentiment_summary['Negative']}, "
+            f"Neutral: {sentiment_summary['Neutral']}")
+
+
+def iter_analyze_company(company, max_articles=10, skip=0, use_gemini=False):
+    """
+    Progressive analyze_company. Yields a snapshot every time an article is summarized or an audio clip is ready:
+    {"Articles", "SentimentSummary", "SentimentAudio", "Done", "Error"}. Article["Audio"] stays None until its clip
+    exists; Error is set (with Done) when there is nothing to show.
+    """
+    news_data = {"Articles": [], "SentimentSummary": None, "SentimentAudio": None, "Done": False, "Error": None}
+
+    def snapshot(**fields):
+        news_data.update(fields)
+        return {**news_data, "Articles": [dict(article) for article in news_data["Articles"]]}
+
+    def set_audio(future):
+        try:
+            audio_futures.pop(future)['Audio'] = future.result()
+        except Exception as e:
+            print(f"Error: Failed to generate article audio due to {e}")
+
     if len(company) < 3:
-        return ("Company name must be at least 3 characters long.", "Company name must be at least 3 characters long.",
-                None)
+        yield snapshot(Done=True, Error="Company name must be at least 3 characters long.")
+        return
 
     use_gemini = use_gemini == "Yes"
 
@@ -51,21 +82,48 @@ def analyze_company(company, max_articles=10, skip=0, use_gemini=False):
         if max_articles > 10:
             max_articles = 10
 
-    articles, sentiment_summary = get_news_summary_sentiment(company, max_articles, skip=skip, use_gemini=use_gemini)
+    sentiment_summary = {"Positive": 0, "Negative": 0, "Neutral": 0}
+    # Audio runs on the shared, rate limited audio executor while later articles are still being summarized
+    audio_futures = {}
 
-    if len(articles) == 0:
-        return "Sorry, no article found at the movement.", "Sorry, no article found at the movement.", None
+    try:
+        for _, article in iter_news_summary_sentiment(company, max_articles, skip=skip, use_gemini=use_gemini):
+            article['Audio'] = None
+            news_data["Articles"].append(article)
+            sentiment_summary[article['Sentiment']] += 1
+            audio_futures[submit_audio(article['Summary'])] = article
+
+            for future in [future for future in audio_futures if future.done()]:
+                set_audio(future)
+
+            yield snapshot(SentimentSummary=format_sentiment_summary(sentiment_summary))
+
+        if len(news_data["Articles"]) == 0:
+            yield snapshot(Done=True, Error="Sorry, no article found at the movement.")
+            return
 
-    sentiment_summary_text = (f"Positive: {sentiment_summary['Positive']}, Negative: {sentiment_summary['Negative']}, "
-                              f"Neutral: {sentiment_summary['Neutral']}")
+        summary_audio_future = submit_audio(news_data["SentimentSummary"])
 
-    for article in articles:
-        time.sleep(1)
-        article['Audio'] = generate_audio(article['Summary'])
+        for future in as_completed(list(audio_futures)):
+            set_audio(future)
+            yield snapshot()
 
-    audio_file = generate_audio(sentiment_summary_text)
+        yield snapshot(SentimentAudio=summary_audio_future.result(), Done=True)
+    finally:
+        # Abandoned run (e.g. the page was closed): drop audio that has not started yet
+        for future in audio_futures:
+            future.cancel()
+
+
+def analyze_company(company, max_articles=10, skip=0, use_gemini=False):
+    news_data = None
+    for news_data in iter_analyze_company(company, max_articles, skip=skip, use_gemini=use_gemini):
+        pass
 
-    return articles, sentiment_summary_text, audio_file
+    if news_data["Error"] is not None:
+        return news_data["Error"], news_data["Error"], None
+
+    return news_data["Articles"], news_data["SentimentSummary"], news_data["SentimentAudio"]
 
 
 def get_news_ui_css():
@@ -105,24 +163,7 @@ def markdown_to_plain_text(md_text):
 
 #  Periodic cleaning (Clean audio files which are older than threshold hours)
 def periodic_clean():
-    PERIODIC_CLEAN_TIME_SECS = os.getenv("PERIODIC_CLEAN_TIME_SECS")
-
-    if PERIODIC_CLEAN_TIME_SECS is None:
-        PERIODIC_CLEAN_TIME_SECS = float(7200.0)
-
-    try:
-        if isinstance(PERIODIC_CLEAN_TIME_SECS, str):
-            PERIODIC_CLEAN_TIME_SECS = float(PERIODIC_CLEAN_TIME_SECS)
-    except ValueError:
-        print("Warning: Invalid PERIODIC_CLEAN_TIME_SECS environment variable. Using default.")
-        PERIODIC_CLEAN_TIME_SECS = 7200.0
-
-    run_clean_audio_threaded()
-    threading.Timer(interval=PERIODIC_CLEAN_TIME_SECS, function=periodic_clean).start()
-
+    """ Start the audio janitor thread; calling it again is a no-op """
+    PERIODIC_CLEAN_TIME_SECS = get_env_float("PERIODIC_CLEAN_TIME_SECS", 7200.0)
 
-def run_clean_audio_threaded():
-    """Runs clean_old_audio in a separate thread."""
-    thread = threading.Thread(target=clean_old_audio)
-    thread.daemon = True
-    thread.start()
+    audio_store.start_janitor(PERIODIC_CLEAN_TIME_SECS)